@@ -1,100 +1,472 @@
-from flask import Flask, jsonify, request, render_template, send_from_directory, redirect, url_for, session
+from flask import Flask, jsonify, request, render_template, send_file, redirect, url_for, session, has_request_context, copy_current_request_context, stream_with_context
 from flask_cors import CORS
-try:
-    from authlib.integrations.flask_client import OAuth
-    _HAVE_AUTHLIB = True
-except Exception:
-    OAuth = None
-    _HAVE_AUTHLIB = False
-from functools import wraps
+import importlib.util
+# authlib is only imported when Auth0 is actually configured (see OAuth setup)
+_HAVE_AUTHLIB = importlib.util.find_spec('authlib') is not None
+from functools import wraps, lru_cache
 from urllib.parse import quote_plus, urlencode
 import requests # Make sure you have run 'pip install requests'
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import re
 import statistics
 import time
 import os
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import traceback
+import io
 import json
-# Optional dotenv support for local development secrets
-try:
-    # Import dynamically to avoid static analyzers/linting errors when
-    # the 'python-dotenv' package is not installed in the environment.
-    import importlib
-    import importlib.util
-
-    if importlib.util.find_spec('dotenv') is not None:
-        load_dotenv = importlib.import_module('dotenv').load_dotenv
-        _HAVE_DOTENV = True
-    else:
-        load_dotenv = None
-        _HAVE_DOTENV = False
-except Exception:
-    load_dotenv = None
-    _HAVE_DOTENV = False
+import hashlib
+import heapq
+import bisect
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 
 # --- Networking safety defaults ---
 DEFAULT_REQUEST_TIMEOUT = 5  # seconds for external API calls
 
+# Optional dotenv support for local development secrets, loaded once here.
+# POYO_SKIP_DOTENV=1 skips it; the resolved .env path is kept in
+# _POYO_DOTENV_PATH so workers started later reuse it instead of walking the
+# filesystem again.
+_HAVE_DOTENV = os.environ.get('POYO_SKIP_DOTENV') != '1' and importlib.util.find_spec('dotenv') is not None
+_DOTENV_LOADED = False
 if _HAVE_DOTENV:
     try:
-        # Import find_dotenv dynamically to avoid static analyzers failing when
+        # Import dynamically to avoid static analyzers/linting errors when
         # the 'python-dotenv' package is not installed in the environment.
-        import importlib
         dotenv_mod = importlib.import_module('dotenv')
-        find_dotenv = getattr(dotenv_mod, 'find_dotenv', None)
-    except Exception:
-        find_dotenv = None
+        env_path = os.environ.get('_POYO_DOTENV_PATH') or dotenv_mod.find_dotenv()
+        if env_path:
+            dotenv_mod.load_dotenv(env_path)
+            os.environ['_POYO_DOTENV_PATH'] = env_path
+        else:
+            # fallback: load_dotenv() tries the default filename
+            dotenv_mod.load_dotenv()
+        _DOTENV_LOADED = True
+    except Exception as e:
+        # Don't crash the app for dotenv issues; just log them
+        print('[env] dotenv load failed:', e)
 
-    try:
-        if callable(load_dotenv) and callable(find_dotenv):
-            load_dotenv(find_dotenv())
-        elif callable(load_dotenv):
-            # fallback: call load_dotenv without an explicit path
-            load_dotenv()
-    except Exception:
-        # ignore errors loading local env file
-        pass
+# Shared session so repeated calls to the same hosts reuse keep-alive
+# connections (and TLS sessions) instead of handshaking every time.
+# Transient 5xx answers to idempotent requests are retried on the pooled
+# connection; the last response is still returned for callers to report.
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=50, pool_maxsize=50,
+                       max_retries=Retry(total=2, backoff_factor=0.1,
+                                         status_forcelist=(500, 502, 503, 504),
+                                         raise_on_status=False))
+_SESSION.mount('http://', _adapter)
+_SESSION.mount('https://', _adapter)
+
+# Optional: orjson for faster JSON decode/encode on API and tool payloads
+try:
+    import orjson
+    _HAS_ORJSON = True
+    _json_loads = orjson.loads
+except Exception:
+    orjson = None
+    _HAS_ORJSON = False
+    _json_loads = json.loads
+
+# Short-lived cache of decoded GET payloads for callers that opt in with
+# cache_ttl=; {url: (fetch_time, payload)}
+_get_cache = {}
+_get_cache_lock = threading.Lock()
 
-def safe_get(url, timeout=None, **kwargs):
+def safe_get(url, timeout=None, cache_ttl=None, **kwargs):
     t = timeout or DEFAULT_REQUEST_TIMEOUT
+    if cache_ttl and not kwargs:
+        with _get_cache_lock:
+            hit = _get_cache.get(url)
+        if hit and time.time() - hit[0] < cache_ttl:
+            return hit[1]
     try:
-        resp = requests.get(url, timeout=t, **kwargs)
-        resp.raise_for_status()
+        # stream=True defers the body download, so error responses are
+        # closed without ever reading or decoding their payload
+        resp = _SESSION.get(url, timeout=t, stream=True, **kwargs)
+        if not resp.ok:
+            resp.close()
+            print(f"[http] GET {url} failed: HTTP {resp.status_code}")
+            return None
+        body = resp.content
         try:
-            return resp.json()
+            payload = _json_loads(body)
         except Exception:
-            return resp.text
+            payload = resp.text
     except Exception as e:
         print(f"[http] GET {url} failed: {e}")
         return None
+    if cache_ttl and not kwargs:
+        with _get_cache_lock:
+            _get_cache[url] = (time.time(), payload)
+    return payload
 
 def safe_post(url, json=None, timeout=None, **kwargs):
     t = timeout or DEFAULT_REQUEST_TIMEOUT
     try:
-        resp = requests.post(url, json=json, timeout=t, **kwargs)
-        resp.raise_for_status()
+        resp = _SESSION.post(url, json=json, timeout=t, stream=True, **kwargs)
+        if not resp.ok:
+            resp.close()
+            print(f"[http] POST {url} failed: HTTP {resp.status_code}")
+            return None
+        body = resp.content
         try:
-            return resp.json()
+            return _json_loads(body)
         except Exception:
             return resp.text
     except Exception as e:
         print(f"[http] POST {url} failed: {e}")
         return None
 
-# Optional: NVIDIA Nemotron client (OpenAI-compatible wrapper)
-try:
-    from openai import OpenAI
-    _HAS_NEMOTRON = True
-except Exception:
-    OpenAI = None
-    _HAS_NEMOTRON = False
+# Optional: NVIDIA Nemotron client (OpenAI-compatible wrapper). The openai
+# package is slow to import, so only check it is installed here and import
+# it on first use.
+_HAS_NEMOTRON = importlib.util.find_spec('openai') is not None
+_OpenAI = None
+
+def _get_openai():
+    """Return the OpenAI client class, importing it on first call (None if unavailable)"""
+    global _OpenAI, _HAS_NEMOTRON
+    if _OpenAI is None and _HAS_NEMOTRON:
+        try:
+            from openai import OpenAI
+            _OpenAI = OpenAI
+        except Exception:
+            _HAS_NEMOTRON = False
+    return _OpenAI
+
+# Nemotron clients keyed by api_key. Each OpenAI() owns its own httpx
+# connection pool, so reuse one per key instead of building one per request.
+_nemotron_clients = {}
+_nemotron_clients_lock = threading.Lock()
+
+def _get_nemotron_client(api_key):
+    """Return a shared Nemotron client for api_key (None if openai is unavailable)"""
+    client = _nemotron_clients.get(api_key)
+    if client is not None:
+        return client
+    openai_cls = _get_openai()
+    if openai_cls is None:
+        return None
+    with _nemotron_clients_lock:
+        client = _nemotron_clients.get(api_key)
+        if client is None:
+            client = openai_cls(
+                base_url="https://integrate.api.nvidia.com/v1",
+                api_key=api_key
+            )
+            _nemotron_clients[api_key] = client
+    return client
 
 # Global state for courier dispatch operations
-active_drains = {}  # {cauldron_id: {'start_time': datetime, 'initial_level': float, 'drain_rate': float}}
-drains_lock = threading.Lock()  # Thread safety for active_drains
-resolved_tickets = set()  # Track ticket IDs that have been resolved (locally)
-resolved_tickets_lock = threading.Lock()  # Thread safety for resolved_tickets
+# {cauldron_id: {'start_time': datetime, 'initial_level': float, 'drain_rate': float}}
+# Copy-on-write: writers hold drains_lock and publish a new dict instead of
+# mutating this one, so readers can take `active_drains` as a lock-free snapshot.
+active_drains = {}
+drains_lock = threading.Lock()  # serializes writers of active_drains
+DRAIN_GRACE_SECONDS = 60  # keep finished drains this long before evicting them
+
+def _sweep_finished_drains(now_ts):
+    """Evict drains past their estimated completion (+grace). Caller holds drains_lock.
+
+    Status polls normally drop completed drains; this covers dispatches made
+    when no poll has run since, so a finished drain does not keep reporting
+    "already draining" and block a new one.
+    """
+    global active_drains
+    stale = [cid for cid, d in active_drains.items()
+             if now_ts >= d.get('estimated_completion_ts', float('inf')) + DRAIN_GRACE_SECONDS]
+    if stale:
+        active_drains = {cid: d for cid, d in active_drains.items() if cid not in stale}
+    return len(stale)
+# Ticket IDs resolved locally, used as a membership map: single-key reads and
+# writes on a dict are atomic under the GIL, so `tid in resolved_tickets`
+# needs no lock. The lock only serializes check-then-set and clear().
+resolved_tickets = {}
+resolved_tickets_lock = threading.Lock()
+
+def _turn_cached(fn):
+    """Memoize a no-arg agent tool for the rest of the current agent turn.
+
+    Active only while ``self._call_cache`` is a dict (set up by
+    plan_and_execute / get_proactive_insights); error results are not kept.
+    A per-key lock makes tools running in parallel share one fetch.
+    """
+    @wraps(fn)
+    def wrapper(self):
+        cache = self._call_cache
+        if cache is None:
+            return fn(self)
+        key = fn.__name__
+        if key in cache:
+            return cache[key]
+        with self._call_locks.setdefault(key, threading.Lock()):
+            if key in cache:
+                return cache[key]
+            result = fn(self)
+            if not (isinstance(result, dict) and 'error' in result):
+                cache[key] = result
+            return result
+    return wrapper
+
+def _in_flask_context(fn):
+    """Wrap fn so a worker thread runs it inside the caller's Flask context."""
+    if has_request_context():
+        return copy_current_request_context(fn)
+    @wraps(fn)
+    def run(*args, **kwargs):
+        with app.app_context():
+            return fn(*args, **kwargs)
+    return run
+
+def _suggestions_by_priority(suggestions):
+    """Bucket a suggest_actions result by priority in one pass."""
+    by_prio = {}
+    for s in suggestions.get('suggestions', ()):
+        by_prio.setdefault(s['priority'], []).append(s)
+    return by_prio
+
+# Whole-message replies to a pending action
+_CONFIRM_REPLIES = frozenset({'yes', 'y', 'ok', 'okay', 'sure', 'do it', 'proceed', 'confirm', 'go ahead'})
+_CANCEL_REPLIES = frozenset({'no', 'n', 'cancel', 'stop', 'abort', 'nope'})
+
+# Fallback report templates for the courier dispatch replies
+_DISPATCH_SUCCESS_TEMPLATE = (
+    "✅ **Courier Dispatched Successfully!**\n\n"
+    "• **Target:** {name}\n"
+    "• **Current Level:** {current:.1f}L / {max_vol}L ({percent:.1f}% full)\n"
+    "• **Drain Rate:** {drain_rate:.1f}L/min\n"
+    "• **Est. Completion:** ~{est_min} minutes\n"
+    "• **Dispatched:** {dispatched_at}\n\n"
+    "🚛 _The courier is now actively draining the cauldron. Watch the dashboard for real-time progress!_"
+)
+_ALREADY_DRAINING_TEMPLATE = (
+    "🚛 **Courier Already Draining {name}!**\n\n"
+    "• **Progress:** {progress:.1f}% drained\n"
+    "• **Remaining:** {current:.1f}L (started at {initial:.1f}L)\n"
+    "• **Time Elapsed:** {elapsed:.1f} minutes\n"
+    "• **Drain Rate:** {drain_rate:.1f}L/min\n\n"
+    "_The drain is ongoing. Check the dashboard for real-time updates!_"
+)
+_BULK_DISPATCH_TEMPLATE = (
+    "✅ **Bulk Courier Dispatch Complete!**\n\n"
+    "• **Threshold:** {threshold}% full or more\n"
+    "• **New Dispatches:** {dispatched} courier(s) sent\n"
+    "• **Already Draining:** {draining} cauldron(s)\n"
+    "• **Already Empty:** {empty} cauldron(s)\n\n"
+)
+
+# Intents whose fallback template is the whole answer; never sent to Nemotron
+_LLM_SKIP_INTENTS = frozenset({'cancel', 'confirm_action'})
+
+# Agent intent keyword groups, in precedence order (the first group hit wins).
+# Matching is by substring, exactly like the `word in msg_lower` checks.
+_INTENT_GROUPS = (
+    ('dispatch', None, ('dispatch', 'send', 'empty', 'courier', 'drain')),
+    ('investigate', 'Investigate discrepancies and anomalies',
+     ('suspicious', 'anomaly', 'ticket', 'discrepancy', 'problem', 'alert', 'issue')),
+    ('predict', 'Forecast fill times and overflow risks',
+     ('forecast', 'overflow', 'time', 'when', 'predict')),
+    ('optimize', 'Optimize courier routes for efficiency',
+     ('optimize', 'route', 'witch', 'efficient')),
+    ('monitor', 'Monitor current cauldron status',
+     ('status', 'how', 'level', 'current', 'what')),
+    ('analyze', 'Analyze network topology',
+     ('network', 'map', 'topology', 'connection')),
+    ('trends', 'Analyze trends and patterns',
+     ('trend', 'pattern', 'history', 'over time')),
+    ('suggest', 'Provide recommendations and suggestions',
+     ('suggest', 'recommend', 'what should', 'advice')),
+    ('performance', 'Compare performance metrics',
+     ('compare', 'performance', 'metric', 'efficiency')),
+    # Modifier that turns a dispatch into a bulk dispatch
+    ('bulk', None, ('all', 'multiple', 'every', 'bulk', '50%', 'above', 'over',
+                    'threshold', 'half full', 'at least')),
+)
+
+def _compile_keyword_groups(groups):
+    """Compile keyword groups into one regex pass over a message.
+
+    The alternation is tried longest-first at every offset (zero-width
+    lookahead), and each keyword maps to the groups of every keyword it
+    contains, so keywords nested in a longer hit are still reported.
+    """
+    kw_groups = {}
+    for group, _, keywords in groups:
+        for kw in keywords:
+            kw_groups.setdefault(kw, set()).add(group)
+    closure = {
+        kw: frozenset(g for other, gs in kw_groups.items() if other in kw for g in gs)
+        for kw in kw_groups
+    }
+    alternation = '|'.join(re.escape(kw) for kw in sorted(kw_groups, key=len, reverse=True))
+    return re.compile(f'(?=({alternation}))'), closure
+
+_INTENT_KEYWORD_RE, _INTENT_KEYWORD_GROUPS = _compile_keyword_groups(_INTENT_GROUPS)
+
+def _intent_groups_hit(msg_lower):
+    """Set of keyword groups with at least one keyword in msg_lower"""
+    hits = set()
+    for m in _INTENT_KEYWORD_RE.finditer(msg_lower):
+        hits |= _INTENT_KEYWORD_GROUPS[m.group(1)]
+    return hits
+
+_CAULDRON_ID_RE = re.compile(r'cauldron_(\d+)')
+_THRESHOLD_RE = re.compile(r'(\d+)\s*%')
+
+# Lookup structures for the cauldron registry, keyed on the list object and a
+# version counter so they are rebuilt only when the registry is replaced or
+# bump_cauldron_registry() records an edit
+_cauldron_registry_version = 0
+_cauldron_lookup_cache = (None, -1, None)
+
+def bump_cauldron_registry():
+    """Invalidate cached cauldron lookups after editing the static registry."""
+    global _cauldron_registry_version
+    _cauldron_registry_version += 1
+
+def _cauldron_lookup(cauldrons):
+    """Return (index, matcher) for the cauldron registry.
+
+    ``index`` maps lowercased id -> id (first cauldron wins, like a linear
+    scan). ``matcher`` is (regex, closure, entries) for finding ids and
+    name words in a message in one pass; ``entries[rank]`` holds
+    (id, len(id), len(name)) in registry order.
+    """
+    global _cauldron_lookup_cache
+    cached_list, cached_version, lookup = _cauldron_lookup_cache
+    if cached_list is cauldrons and cached_version == _cauldron_registry_version:
+        return lookup
+    version = _cauldron_registry_version
+    index = {}
+    entries = []
+    groups = []
+    for rank, c in enumerate(cauldrons):
+        cid = c.get('id', '')
+        name = c.get('name', '')
+        index.setdefault(cid.lower(), c.get('id'))
+        entries.append((cid, len(cid), len(name)))
+        if cid:
+            groups.append((('id', rank), None, (cid.lower(),)))
+        words = tuple(name.lower().split())
+        if words:
+            groups.append((('name', rank), None, words))
+    regex, closure = _compile_keyword_groups(groups) if groups else (None, {})
+    lookup = (index, (regex, closure, entries))
+    _cauldron_lookup_cache = (cauldrons, version, lookup)
+    return lookup
+
+# Constant system turn shared by every Nemotron synthesis request
+_NEMOTRON_SYSTEM_MSG = {
+    "role": "system",
+    "content": (
+        "You are an intelligent factory monitoring agent with access to real-time data and tools. "
+        "Based on the tool execution results, provide a clear, actionable response to the user. "
+        "Be concise but informative. Highlight any urgent issues and recommend next steps."
+    ),
+}
+
+# Short-lived cache of Nemotron replies so identical turns seconds apart (e.g.
+# dashboard polling) skip the remote LLM round trip
+NEMOTRON_CACHE_TTL = 15.0  # seconds
+NEMOTRON_CACHE_MAXSIZE = 256
+_VOLATILE_RESULT_KEYS = frozenset({'dispatched_at', 'elapsed_minutes', 'timestamp', 'generated_at'})
+_nemotron_cache = OrderedDict()  # key -> (stored_at, response), oldest first
+_nemotron_cache_lock = threading.Lock()
+
+def _strip_volatile(obj):
+    """Copy of a tool result without per-call timestamps, for cache keys"""
+    if isinstance(obj, dict):
+        return {k: _strip_volatile(v) for k, v in obj.items() if k not in _VOLATILE_RESULT_KEYS}
+    if isinstance(obj, (list, tuple)):
+        return [_strip_volatile(v) for v in obj]
+    return obj
+
+def _nemotron_cache_key(user_message, intent_type, tool_results):
+    payload = json.dumps(
+        {'m': user_message.strip().lower(), 'i': intent_type, 'r': _strip_volatile(tool_results)},
+        sort_keys=True, default=str
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+def _dump_for_prompt(obj):
+    """Serialize a tool result for the LLM prompt (indented orjson, else compact json)"""
+    if _HAS_ORJSON:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj)
+
+def _nemotron_cache_get(key):
+    with _nemotron_cache_lock:
+        hit = _nemotron_cache.get(key)
+        if hit is None:
+            return None
+        if time.time() - hit[0] >= NEMOTRON_CACHE_TTL:
+            del _nemotron_cache[key]
+            return None
+        _nemotron_cache.move_to_end(key)
+        return hit[1]
+
+def _nemotron_cache_put(key, response):
+    with _nemotron_cache_lock:
+        _nemotron_cache[key] = (time.time(), response)
+        _nemotron_cache.move_to_end(key)
+        while len(_nemotron_cache) > NEMOTRON_CACHE_MAXSIZE:
+            _nemotron_cache.popitem(last=False)
+
+# Parameter-free execution plans by intent type. Shared and read-only:
+# callers only read 'steps' / 'tools', so the values are tuples.
+_PLAN_TABLE = {
+    'cancel': {
+        'steps': ('Cancel pending action',),
+        'tools': ()
+    },
+    'investigate': {
+        'steps': ('Check tickets', 'Detect anomalies', 'Get status', 'Generate report'),
+        'tools': ('check_tickets', 'detect_anomalies', 'get_status')
+    },
+    'predict': {
+        'steps': ('Get forecasts', 'Detect anomalies', 'Prioritize risks'),
+        'tools': ('forecast_fills', 'detect_anomalies')
+    },
+    'optimize': {
+        'steps': ('Analyze network', 'Get forecasts', 'Optimize routes', 'Validate plan'),
+        'tools': ('analyze_network', 'forecast_fills', 'optimize_routes')
+    },
+    'monitor': {
+        'steps': ('Get status', 'Detect anomalies', 'Summarize findings'),
+        'tools': ('get_status', 'detect_anomalies')
+    },
+    'analyze': {
+        'steps': ('Analyze network', 'Get status', 'Compute metrics'),
+        'tools': ('analyze_network', 'get_status')
+    },
+    'trends': {
+        'steps': ('Analyze trends', 'Get status', 'Identify patterns'),
+        'tools': ('analyze_trends', 'get_status')
+    },
+    'suggest': {
+        'steps': ('Suggest actions', 'Get status', 'Prioritize recommendations'),
+        'tools': ('suggest_actions', 'get_status', 'detect_anomalies')
+    },
+    'performance': {
+        'steps': ('Compare performance', 'Analyze trends', 'Benchmark metrics'),
+        'tools': ('compare_performance', 'analyze_trends')
+    },
+}
+_DEFAULT_PLAN = {
+    'steps': ('Get status', 'Provide overview', 'Suggest next steps'),
+    'tools': ('get_status', 'suggest_actions')
+}
+_CONFIRMED_OPTIMIZE_PLAN = {
+    'steps': ('Execute confirmed optimization',),
+    'tools': ('optimize_routes',)
+}
 
 # --- Agent System: Multi-step workflow with tool integration ---
 class AgentWorkflow:
@@ -112,13 +484,30 @@ class AgentWorkflow:
     - Autonomous recommendations
     - Multi-cauldron coordination
     """
+    # Tools that change state; they run one at a time after the read-only ones
+    _SERIAL_TOOLS = frozenset({'dispatch_courier', 'dispatch_bulk'})
+    _executor = None
+    _executor_lock = threading.Lock()
+    
+    @classmethod
+    def _get_executor(cls):
+        """Shared pool for running independent read-only tools concurrently"""
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='agent-tool')
+        return cls._executor
+    
     def __init__(self, nemotron_client=None):
         self.client = nemotron_client
+        self._create_completion = nemotron_client.chat.completions.create if nemotron_client else None
         self.conversation_history = []
         self.last_alert_time = {}
         self.alert_cooldown = 300  # 5 minutes between similar alerts
         self.last_suggestion = None  # Track last suggested action
         self.pending_action = None  # Track pending action awaiting confirmation
+        self._call_cache = None  # Per-turn tool results, see _turn_cached
+        self._call_locks = {}
         self.tools = {
             'check_tickets': self._check_tickets,
             'forecast_fills': self._forecast_fills,
@@ -133,6 +522,7 @@ class AgentWorkflow:
             'compare_performance': self._compare_performance
         }
     
+    @_turn_cached
     def _check_tickets(self):
         """Tool: Analyze tickets for discrepancies"""
         try:
@@ -146,32 +536,44 @@ class AgentWorkflow:
     def _forecast_fills(self):
         """Tool: Get fill time forecasts"""
         try:
-            return forecast_fill_times()
+            levels, error = _build_levels()
+            if error:
+                return {'error': 'Could not get live levels for forecast.'}
+            return _build_forecasts(levels)
         except Exception as e:
             return {'error': str(e)}
     
+    @_turn_cached
     def _get_status(self):
         """Tool: Get current cauldron status"""
         try:
-            res = cauldron_status()
-            if res.status_code == 200:
-                data = res.get_json()
-                
-                # Annotate with drain status for clarity
-                global active_drains
+            data, error = _status_rows()
+            if error is None:
+                # Annotate with drain status for clarity. Take the current
+                # drains snapshot and work out every drain's start time and
+                # progress in one pass before touching the rows.
                 if isinstance(data, list):
-                    for cauldron in data:
-                        cid = cauldron.get('id')
-                        if cid in active_drains:
-                            drain_info = active_drains[cid]
-                            cauldron['drain_status'] = {
-                                'active': True,
-                                'started': drain_info['start_time'].isoformat(),
-                                'progress': cauldron.get('drain_progress', 0)
-                            }
+                    snap = active_drains
+                    if snap:
+                        now = datetime.now()
+                        drain_annotations = {}
+                        for cid, drain_info in snap.items():
+                            initial = drain_info['initial_level']
+                            elapsed_min = (now - drain_info['start_time']).total_seconds() / 60
+                            progress = (elapsed_min * drain_info['drain_rate'] / initial * 100) if initial > 0 else 100
+                            drain_annotations[cid] = (drain_info['start_time'].isoformat(),
+                                                      round(min(100.0, max(0.0, progress)), 1))
+                        for cauldron in data:
+                            ann = drain_annotations.get(cauldron.get('id'))
+                            if ann:
+                                cauldron['drain_status'] = {
+                                    'active': True,
+                                    'started': ann[0],
+                                    'progress': cauldron.get('drain_progress', ann[1])
+                                }
                 
                 return data
-            return {'error': f'HTTP {res.status_code}'}
+            return {'error': error}
         except Exception as e:
             return {'error': str(e)}
     
@@ -181,7 +583,7 @@ class AgentWorkflow:
         
         try:
             # Get all unresolved tickets for this cauldron
-            tickets_raw = safe_get(EOG_API_BASE_URL + '/api/Tickets')
+            tickets_raw = safe_get(EOG_API_BASE_URL + '/api/Tickets', cache_ttl=1.0)
             if not tickets_raw:
                 print(f"[RESOLVE] Could not fetch tickets for {cauldron_id}")
                 return
@@ -190,25 +592,37 @@ class AgentWorkflow:
                 tickets_raw.get('transport_tickets') if isinstance(tickets_raw, dict) else []
             )
             
-            resolved_count = 0
-            with resolved_tickets_lock:
-                for ticket in tickets_list:
-                    ticket_cauldron = ticket.get('cauldronId') or ticket.get('cauldron_id') or ticket.get('cauldron')
-                    ticket_id = ticket.get('id') or ticket.get('ticket_id') or ticket.get('ticketId')
-                    
-                    # Mark all tickets for this cauldron as resolved locally
-                    if ticket_cauldron == cauldron_id and ticket_id and ticket_id not in resolved_tickets:
-                        resolved_tickets.add(ticket_id)
-                        resolved_count += 1
-                        print(f"[RESOLVE] ✓ Locally resolved ticket {ticket_id} for {cauldron_id}")
-                        
-                        # Optionally try to resolve via API (but don't fail if it doesn't work)
-                        try:
-                            url = f"{EOG_API_BASE_URL}/api/Tickets/{ticket_id}"
-                            requests.put(url, json={'status': 'resolved'}, timeout=2, verify=False)
-                        except:
-                            pass  # Ignore API errors - we track locally
+            to_put = []
+            for ticket in tickets_list:
+                ticket_cauldron = ticket.get('cauldronId') or ticket.get('cauldron_id') or ticket.get('cauldron')
+                ticket_id = ticket.get('id') or ticket.get('ticket_id') or ticket.get('ticketId')
+                if ticket_cauldron != cauldron_id or not ticket_id or ticket_id in resolved_tickets:
+                    continue
+                
+                # Mark the ticket as resolved locally (short critical section)
+                with resolved_tickets_lock:
+                    if ticket_id in resolved_tickets:
+                        continue
+                    resolved_tickets[ticket_id] = True
+                to_put.append(ticket_id)
+                print(f"[RESOLVE] ✓ Locally resolved ticket {ticket_id} for {cauldron_id}")
+            
+            # Optionally try to resolve via API (but don't fail if it doesn't work).
+            # The PUTs are independent, so fan them out instead of K x RTT.
+            def put_resolved(ticket_id):
+                try:
+                    url = f"{EOG_API_BASE_URL}/api/Tickets/{ticket_id}"
+                    _SESSION.put(url, json={'status': 'resolved'}, timeout=2, verify=False)
+                except Exception:
+                    pass  # Ignore API errors - we track locally
+            
+            if len(to_put) == 1:
+                put_resolved(to_put[0])
+            elif to_put:
+                with ThreadPoolExecutor(max_workers=min(16, len(to_put))) as ex:
+                    list(ex.map(put_resolved, to_put))
             
+            resolved_count = len(to_put)
             if resolved_count > 0:
                 print(f"[RESOLVE] ✅ Marked {resolved_count} ticket(s) as resolved for {cauldron_id}")
             else:
@@ -217,14 +631,22 @@ class AgentWorkflow:
         except Exception as e:
             print(f"[RESOLVE] Error in _resolve_tickets_for_cauldron: {e}")
     
-    def _dispatch_courier(self, cauldron_id):
-        """Tool: Dispatch courier to cauldron - initiates gradual draining"""
+    def _dispatch_courier(self, cauldron_id, live_cauldron=None):
+        """Tool: Dispatch courier to cauldron - initiates gradual draining.
+
+        ``live_cauldron`` is the cauldron's row from an already-fetched
+        status payload; when given, the status is not fetched again.
+        """
         if not cauldron_id:
             return {'error': 'No cauldron ID provided', 'status': 'failed'}
         
+        # One clock read for the whole dispatch so start, completion and
+        # dispatched_at all describe the same instant
+        now = datetime.now()
+        
         try:
             # Validate cauldron exists in static data
-            cauldron_static = next((c for c in factory_static_data['cauldrons'] if c['id'] == cauldron_id), None)
+            cauldron_static = _CAULDRONS_BY_ID.get(cauldron_id)
             
             if not cauldron_static:
                 return {
@@ -233,8 +655,10 @@ class AgentWorkflow:
                 }
             
             # Get LIVE current level from status endpoint
-            status_data = self._get_status()
-            cauldron_live = next((c for c in status_data if c['id'] == cauldron_id), None) if isinstance(status_data, list) else None
+            cauldron_live = live_cauldron
+            if cauldron_live is None:
+                status_data = self._get_status()
+                cauldron_live = next((c for c in status_data if c['id'] == cauldron_id), None) if isinstance(status_data, list) else None
             
             if not cauldron_live:
                 return {
@@ -263,10 +687,12 @@ class AgentWorkflow:
             # Check if already draining - don't restart the drain
             global active_drains, drains_lock
             
+            now_ts = now.timestamp()
             with drains_lock:
+                _sweep_finished_drains(now_ts)
                 if cauldron_id in active_drains:
                     existing_drain = active_drains[cauldron_id]
-                    elapsed = (datetime.now() - existing_drain['start_time']).total_seconds() / 60
+                    elapsed = (now - existing_drain['start_time']).total_seconds() / 60
                     drained_so_far = elapsed * existing_drain['drain_rate']
                     remaining = max(0, existing_drain['initial_level'] - drained_so_far)
                     progress = (drained_so_far / existing_drain['initial_level'] * 100) if existing_drain['initial_level'] > 0 else 100
@@ -288,20 +714,22 @@ class AgentWorkflow:
                 
                 # Start the drain operation
                 print(f"[DISPATCH] Starting NEW drain for {cauldron_id}: {current_level:.1f}L at {drain_rate:.1f}L/min")
-                active_drains[cauldron_id] = {
-                'start_time': datetime.now(),
+                active_drains = {**active_drains, cauldron_id: {
+                'start_time': now,
                 'initial_level': current_level,
                 'drain_rate': drain_rate,
-                'cauldron_name': cauldron_static.get('name', cauldron_id)
-            }
+                'cauldron_name': cauldron_static.get('name', cauldron_id),
+                'estimated_completion_ts': now_ts + (current_level / drain_rate * 60 if drain_rate > 0 else 0),
+                'logged_mask': 0  # bit n set once the n*10% milestone was logged
+            }}
             
             # Calculate estimated completion time
             if drain_rate > 0:
                 estimated_minutes = current_level / drain_rate
-                completion_time = datetime.now() + timedelta(minutes=estimated_minutes)
+                completion_time = now + timedelta(minutes=estimated_minutes)
             else:
                 estimated_minutes = 0
-                completion_time = datetime.now()
+                completion_time = now
             
             print(f"[DISPATCH] Courier dispatched to {cauldron_static.get('name', cauldron_id)}")
             print(f"[DISPATCH] Draining {current_level:.1f}L at {drain_rate:.1f}L/min (~{estimated_minutes:.1f} min)")
@@ -317,7 +745,7 @@ class AgentWorkflow:
                 'message': f"Courier dispatched to {cauldron_static.get('name', cauldron_id)}",
                 'cauldron_id': cauldron_id,
                 'cauldron_name': cauldron_static.get('name', cauldron_id),
-                'dispatched_at': datetime.now().isoformat(),
+                'dispatched_at': now.isoformat(),
                 'current_level': current_level,
                 'max_volume': max_volume,
                 'percent_full': (current_level / max_volume * 100) if max_volume > 0 else 0,
@@ -342,42 +770,56 @@ class AgentWorkflow:
                 return {'error': 'Could not fetch cauldron status', 'status': 'failed'}
             
             # Filter cauldrons above threshold
+            candidates = [c for c in status_data if c.get('percent_full', 0) >= threshold]
+            
+            # Dispatches are independent and wait on ticket resolution I/O,
+            # so run them concurrently; results keep status order.
+            def dispatch_row(cauldron):
+                return self._dispatch_courier(cauldron.get('id'), live_cauldron=cauldron)
+            
+            if len(candidates) > 1:
+                # one context wrapper per task: a copied request context can
+                # only be pushed by one thread at a time
+                ex = self._get_executor()
+                futures = [ex.submit(_in_flask_context(dispatch_row), c) for c in candidates]
+                results = [f.result() for f in futures]
+            else:
+                results = [dispatch_row(c) for c in candidates]
+            
             dispatched = []
             already_draining = []
             already_empty = []
             errors = []
             
-            for cauldron in status_data:
+            for cauldron, result in zip(candidates, results):
                 cauldron_id = cauldron.get('id')
                 percent_full = cauldron.get('percent_full', 0)
                 
-                if percent_full >= threshold:
-                    result = self._dispatch_courier(cauldron_id)
-                    if result.get('status') == 'success':
-                        if result.get('already_draining'):
-                            already_draining.append({
-                                'cauldron_id': cauldron_id,
-                                'cauldron_name': result.get('cauldron_name'),
-                                'percent_full': percent_full,
-                                'progress': result.get('drain_progress', 0)
-                            })
-                        elif result.get('already_empty'):
-                            already_empty.append({
-                                'cauldron_id': cauldron_id,
-                                'cauldron_name': result.get('cauldron_name')
-                            })
-                        else:
-                            dispatched.append({
-                                'cauldron_id': cauldron_id,
-                                'cauldron_name': result.get('cauldron_name'),
-                                'percent_full': percent_full,
-                                'estimated_minutes': result.get('estimated_minutes', 0)
-                            })
+                if result.get('status') == 'success':
+                    if result.get('already_draining'):
+                        already_draining.append({
+                            'cauldron_id': cauldron_id,
+                            'cauldron_name': result.get('cauldron_name'),
+                            'percent_full': percent_full,
+                            'progress': result.get('drain_progress', 0)
+                        })
+                    elif result.get('already_empty'):
+                        already_empty.append({
+                            'cauldron_id': cauldron_id,
+                            'cauldron_name': result.get('cauldron_name')
+                        })
                     else:
-                        errors.append({
+                        dispatched.append({
                             'cauldron_id': cauldron_id,
-                            'error': result.get('error', 'Unknown error')
+                            'cauldron_name': result.get('cauldron_name'),
+                            'percent_full': percent_full,
+                            'estimated_minutes': result.get('estimated_minutes', 0)
                         })
+                else:
+                    errors.append({
+                        'cauldron_id': cauldron_id,
+                        'error': result.get('error', 'Unknown error')
+                    })
             
             return {
                 'status': 'success',
@@ -420,100 +862,72 @@ class AgentWorkflow:
         except Exception as e:
             return {'error': str(e)}
     
-    def _detect_anomalies(self):
-        """Tool: Detect anomalies in cauldron behavior"""
+    @_turn_cached
+    def _analyze_all(self):
+        """Fused pass producing the anomaly, trend and suggestion tool outputs.
+
+        A single loop over the status rows emits all three result lists.
+        """
         try:
             status_data = self._get_status()
             if isinstance(status_data, dict) and 'error' in status_data:
                 return status_data
             
             anomalies = []
-            for c in status_data:
-                # Skip anomaly detection if actively draining
-                if c.get('is_draining'):
-                    continue
-                
-                # Check for unusual fill rates
-                if c.get('percent_full', 0) > 95:
-                    anomalies.append({
-                        'cauldron': c.get('id'),
-                        'type': 'critical_fill',
-                        'severity': 'high',
-                        'details': f"{c.get('percent_full')}% full"
-                    })
-                
-                # Check for discrepancies
-                if c.get('has_discrepancy'):
-                    anomalies.append({
-                        'cauldron': c.get('id'),
-                        'type': 'ticket_mismatch',
-                        'severity': 'medium',
-                        'details': 'Ticket discrepancy detected'
-                    })
-                
-                # Check for rapid fill (time to full < 10 minutes)
-                if c.get('time_to_full_min') and c.get('time_to_full_min') < 10:
-                    anomalies.append({
-                        'cauldron': c.get('id'),
-                        'type': 'rapid_fill',
-                        'severity': 'high',
-                        'details': f"Will overflow in {c.get('time_to_full_min')} minutes"
-                    })
-            
-            return {'anomalies': anomalies, 'count': len(anomalies)}
-        except Exception as e:
-            return {'error': str(e)}
-    
-    def _analyze_trends(self):
-        """Tool: Analyze cauldron fill trends over time"""
-        try:
-            status_data = self._get_status()
-            if isinstance(status_data, dict) and 'error' in status_data:
-                return status_data
-            
             trends = []
+            suggestions = []
             for c in status_data:
+                cid = c.get('id')
                 pct = c.get('percent_full', 0)
                 rate = c.get('fill_rate_per_min', 0)
+                ttf = c.get('time_to_full_min')
+                
+                # Anomalies skip cauldrons that are actively draining
+                if not c.get('is_draining'):
+                    # Check for unusual fill rates
+                    if pct > 95:
+                        anomalies.append({
+                            'cauldron': cid,
+                            'type': 'critical_fill',
+                            'severity': 'high',
+                            'details': f"{pct}% full"
+                        })
+                    
+                    # Check for discrepancies
+                    if c.get('has_discrepancy'):
+                        anomalies.append({
+                            'cauldron': cid,
+                            'type': 'ticket_mismatch',
+                            'severity': 'medium',
+                            'details': 'Ticket discrepancy detected'
+                        })
+                    
+                    # Check for rapid fill (time to full < 10 minutes)
+                    if ttf and ttf < 10:
+                        anomalies.append({
+                            'cauldron': cid,
+                            'type': 'rapid_fill',
+                            'severity': 'high',
+                            'details': f"Will overflow in {ttf} minutes"
+                        })
                 
-                # Calculate trend direction
+                # Trend direction
                 if pct > 80:
                     trend = 'critical' if rate > 0 else 'stable'
                 elif pct > 50:
                     trend = 'rising' if rate > 0.5 else 'moderate'
                 else:
                     trend = 'healthy'
-                
                 trends.append({
-                    'cauldron': c.get('id'),
+                    'cauldron': cid,
                     'name': c.get('name'),
                     'current_level': pct,
                     'fill_rate': rate,
                     'trend': trend,
-                    'time_to_full': c.get('time_to_full_min')
+                    'time_to_full': ttf
                 })
-            
-            return {'trends': trends, 'total': len(trends)}
-        except Exception as e:
-            return {'error': str(e)}
-    
-    def _suggest_actions(self):
-        """Tool: Proactively suggest actions based on current state"""
-        try:
-            status_data = self._get_status()
-            anomalies = self._detect_anomalies()
-            
-            if isinstance(status_data, dict) and 'error' in status_data:
-                return status_data
-            
-            suggestions = []
-            
-            # Check for cauldrons needing immediate attention
-            for c in status_data:
-                cid = c.get('id')
-                pct = c.get('percent_full', 0)
-                ttf = c.get('time_to_full_min')
                 
+                # Cauldrons needing attention
                 if pct > 95:
                     suggestions.append({
                         'priority': 'URGENT',
@@ -530,7 +944,7 @@ class AgentWorkflow:
                         'reason': f'{c.get("name")} will be full in {ttf:.0f} minutes',
                         'eta_minutes': ttf
                     })
-                elif pct < 20 and c.get('fill_rate_per_min', 0) < 0:
+                elif pct < 20 and rate < 0:
                     suggestions.append({
                         'priority': 'LOW',
                         'cauldron': cid,
@@ -550,19 +964,38 @@ class AgentWorkflow:
                 })
             
             # Check for ticket discrepancies
-            if anomalies.get('count', 0) > 5:
+            if len(anomalies) > 5:
                 suggestions.append({
                     'priority': 'MEDIUM',
                     'cauldron': 'SYSTEM',
                     'action': 'audit_tickets',
-                    'reason': f'{anomalies["count"]} anomalies detected - ticket audit recommended',
+                    'reason': f'{len(anomalies)} anomalies detected - ticket audit recommended',
                     'eta_minutes': None
                 })
             
-            return {'suggestions': suggestions, 'count': len(suggestions)}
+            return {
+                'anomalies': {'anomalies': anomalies, 'count': len(anomalies)},
+                'trends': {'trends': trends, 'total': len(trends)},
+                'suggestions': {'suggestions': suggestions, 'count': len(suggestions)}
+            }
         except Exception as e:
             return {'error': str(e)}
     
+    def _detect_anomalies(self):
+        """Tool: Detect anomalies in cauldron behavior"""
+        result = self._analyze_all()
+        return result if 'error' in result else result['anomalies']
+    
+    def _analyze_trends(self):
+        """Tool: Analyze cauldron fill trends over time"""
+        result = self._analyze_all()
+        return result if 'error' in result else result['trends']
+    
+    def _suggest_actions(self):
+        """Tool: Proactively suggest actions based on current state"""
+        result = self._analyze_all()
+        return result if 'error' in result else result['suggestions']
+    
     def _compare_performance(self):
         """Tool: Compare current performance to historical averages"""
         try:
@@ -571,14 +1004,21 @@ class AgentWorkflow:
                 return status_data
             
             # Calculate system-wide metrics
-            total_capacity = sum(c.get('max_volume', 0) for c in factory_static_data.get('cauldrons', []))
-            current_volume = sum(c.get('current_level', 0) for c in status_data)
+            static_cauldrons = factory_static_data.get('cauldrons', [])
+            total_capacity = sum(c.get('max_volume', 0) for c in static_cauldrons)
+            current_volume = 0
+            high_risk = medium_risk = low_risk = 0
+            for c in status_data:
+                current_volume += c.get('current_level', 0)
+                pct = c.get('percent_full', 0)
+                if pct > 85:
+                    high_risk += 1
+                elif pct > 50:
+                    medium_risk += 1
+                else:
+                    low_risk += 1
             avg_fill_pct = (current_volume / total_capacity * 100) if total_capacity > 0 else 0
             
-            high_risk = len([c for c in status_data if c.get('percent_full', 0) > 85])
-            medium_risk = len([c for c in status_data if 50 < c.get('percent_full', 0) <= 85])
-            low_risk = len([c for c in status_data if c.get('percent_full', 0) <= 50])
-            
             return {
                 'system_utilization': round(avg_fill_pct, 1),
                 'total_capacity': total_capacity,
@@ -600,6 +1040,8 @@ class AgentWorkflow:
         Returns important information the user should know about
         """
         insights = []
+        now_iso = datetime.now().isoformat()  # shared by every insight in this batch
+        self._call_cache = {}
         
         try:
             # Get current state
@@ -616,7 +1058,7 @@ class AgentWorkflow:
                             'type': 'ALERT',
                             'severity': 'HIGH',
                             'message': f"⚠️ {a['cauldron']}: {a['details']}",
-                            'timestamp': datetime.now().isoformat()
+                            'timestamp': now_iso
                         })
             
             # Performance warnings
@@ -627,14 +1069,14 @@ class AgentWorkflow:
                         'type': 'WARNING',
                         'severity': 'HIGH',
                         'message': f"🔴 System utilization at {performance['system_utilization']}% - critical level",
-                        'timestamp': datetime.now().isoformat()
+                        'timestamp': now_iso
                     })
                 elif perf_status == 'WARNING':
                     insights.append({
                         'type': 'INFO',
                         'severity': 'MEDIUM',
                         'message': f"🟡 System utilization at {performance['system_utilization']}% - monitor closely",
-                        'timestamp': datetime.now().isoformat()
+                        'timestamp': now_iso
                     })
             
             # Action recommendations
@@ -646,7 +1088,7 @@ class AgentWorkflow:
                             'type': 'ACTION',
                             'severity': 'URGENT',
                             'message': f"🚨 {sug['reason']} - Recommended: {sug['action']}",
-                            'timestamp': datetime.now().isoformat(),
+                            'timestamp': now_iso,
                             'action': sug['action'],
                             'cauldron': sug['cauldron']
                         })
@@ -654,11 +1096,14 @@ class AgentWorkflow:
             return {
                 'insights': insights,
                 'count': len(insights),
-                'generated_at': datetime.now().isoformat()
+                'generated_at': now_iso
             }
             
         except Exception as e:
             return {'error': str(e), 'insights': [], 'count': 0}
+        finally:
+            self._call_cache = None
+            self._call_locks = {}
     
     def plan_and_execute(self, user_message):
         """
@@ -679,13 +1124,38 @@ class AgentWorkflow:
         plan = self._create_plan(intent, user_message)
         steps.append(f"Execution Plan: {' → '.join(plan['steps'])}")
         
-        # Step 3: Execute tools
-        for tool_name in plan['tools']:
-            if tool_name in self.tools:
-                steps.append(f"Executing: {tool_name}")
-                result = self._execute_tool(tool_name, plan.get('params', {}))
-                tool_results[tool_name] = result
-                steps.append(f"Result: {self._summarize_result(result)}")
+        # Step 3: Execute tools. Read-only tools are independent and mostly
+        # wait on the network, so they run concurrently; state-changing tools
+        # run afterwards in plan order. Shared fetches are reused per turn.
+        tool_names = [t for t in plan['tools'] if t in self.tools]
+        params = plan.get('params', {})
+        read_only = [t for t in tool_names if t not in self._SERIAL_TOOLS]
+        results = {}
+        self._call_cache = {}
+        try:
+            if len(read_only) > 1:
+                executor = self._get_executor()
+                futures = {
+                    executor.submit(_in_flask_context(self._execute_tool), t, params): t
+                    for t in read_only
+                }
+                for fut in as_completed(futures):
+                    results[futures[fut]] = fut.result()
+            else:
+                for tool_name in read_only:
+                    results[tool_name] = self._execute_tool(tool_name, params)
+            for tool_name in tool_names:
+                if tool_name in self._SERIAL_TOOLS:
+                    results[tool_name] = self._execute_tool(tool_name, params)
+        finally:
+            self._call_cache = None
+            self._call_locks = {}
+        
+        for tool_name in tool_names:
+            result = results[tool_name]
+            tool_results[tool_name] = result
+            steps.append(f"Executing: {tool_name}")
+            steps.append(f"Result: {self._summarize_result(result)}")
         
         # Step 4: Synthesize response
         response = self._synthesize_response(user_message, intent, tool_results, steps)
@@ -702,43 +1172,30 @@ class AgentWorkflow:
         msg_lower = message.lower().strip()
         
         # Check for confirmation responses (yes/no/ok)
-        if msg_lower in ['yes', 'y', 'ok', 'okay', 'sure', 'do it', 'proceed', 'confirm', 'go ahead']:
+        if msg_lower in _CONFIRM_REPLIES:
             if self.pending_action:
                 return {
                     'type': 'confirm_action', 
                     'description': f'Confirm pending action: {self.pending_action.get("action")}'
                 }
         
-        if msg_lower in ['no', 'n', 'cancel', 'stop', 'abort', 'nope']:
+        if msg_lower in _CANCEL_REPLIES:
             self.pending_action = None
             return {'type': 'cancel', 'description': 'Cancel pending action'}
         
-        # Regular intent analysis
+        # Regular intent analysis: one scan finds every keyword group present
+        hits = _intent_groups_hit(msg_lower)
+        
         # CHECK DISPATCH FIRST - before predict (to catch "dispatch to all full cauldrons")
-        if any(word in msg_lower for word in ['dispatch', 'send', 'empty', 'courier', 'drain']):
+        if 'dispatch' in hits:
             # Check if it's a bulk dispatch request
-            if any(word in msg_lower for word in ['all', 'multiple', 'every', 'bulk', '50%', 'above', 'over', 'threshold', 'half full', 'at least']):
+            if 'bulk' in hits:
                 return {'type': 'action_bulk', 'description': 'Dispatch couriers to multiple cauldrons'}
-            else:
-                return {'type': 'action', 'description': 'Dispatch courier to manage cauldron'}
-        elif any(word in msg_lower for word in ['suspicious', 'anomaly', 'ticket', 'discrepancy', 'problem', 'alert', 'issue']):
-            return {'type': 'investigate', 'description': 'Investigate discrepancies and anomalies'}
-        elif any(word in msg_lower for word in ['forecast', 'overflow', 'time', 'when', 'predict']):
-            return {'type': 'predict', 'description': 'Forecast fill times and overflow risks'}
-        elif any(word in msg_lower for word in ['optimize', 'route', 'witch', 'efficient']):
-            return {'type': 'optimize', 'description': 'Optimize courier routes for efficiency'}
-        elif any(word in msg_lower for word in ['status', 'how', 'level', 'current', 'what']):
-            return {'type': 'monitor', 'description': 'Monitor current cauldron status'}
-        elif any(word in msg_lower for word in ['network', 'map', 'topology', 'connection']):
-            return {'type': 'analyze', 'description': 'Analyze network topology'}
-        elif any(word in msg_lower for word in ['trend', 'pattern', 'history', 'over time']):
-            return {'type': 'trends', 'description': 'Analyze trends and patterns'}
-        elif any(word in msg_lower for word in ['suggest', 'recommend', 'what should', 'advice']):
-            return {'type': 'suggest', 'description': 'Provide recommendations and suggestions'}
-        elif any(word in msg_lower for word in ['compare', 'performance', 'metric', 'efficiency']):
-            return {'type': 'performance', 'description': 'Compare performance metrics'}
-        else:
-            return {'type': 'general', 'description': 'General inquiry about factory'}
+            return {'type': 'action', 'description': 'Dispatch courier to manage cauldron'}
+        for intent_type, description, _ in _INTENT_GROUPS:
+            if description and intent_type in hits:
+                return {'type': intent_type, 'description': description}
+        return {'type': 'general', 'description': 'General inquiry about factory'}
     
     def _create_plan(self, intent, message):
         """Create execution plan based on intent"""
@@ -751,123 +1208,71 @@ class AgentWorkflow:
             
             if action_type == 'dispatch_courier':
                 return {
-                    'steps': ['Execute confirmed dispatch', 'Update status'],
-                    'tools': ['dispatch_courier'],
+                    'steps': ('Execute confirmed dispatch', 'Update status'),
+                    'tools': ('dispatch_courier',),
                     'params': {'cauldron_id': cauldron_id}
                 }
             elif action_type == 'optimize_routes':
-                return {
-                    'steps': ['Execute confirmed optimization'],
-                    'tools': ['optimize_routes']
-                }
+                return _CONFIRMED_OPTIMIZE_PLAN
         
-        # Handle cancellation
-        if intent_type == 'cancel':
-            return {
-                'steps': ['Cancel pending action'],
-                'tools': []
-            }
-        
-        if intent_type == 'investigate':
-            return {
-                'steps': ['Check tickets', 'Detect anomalies', 'Get status', 'Generate report'],
-                'tools': ['check_tickets', 'detect_anomalies', 'get_status']
-            }
-        elif intent_type == 'predict':
-            return {
-                'steps': ['Get forecasts', 'Detect anomalies', 'Prioritize risks'],
-                'tools': ['forecast_fills', 'detect_anomalies']
-            }
-        elif intent_type == 'action_bulk':
-            # Extract threshold from message if mentioned
-            import re
+        if intent_type == 'action_bulk':
+            # Extract threshold from message if mentioned; most messages have
+            # no '%' at all, so check for it before running the regex
             threshold = 50  # default
-            match = re.search(r'(\d+)\s*%', message)
+            match = _THRESHOLD_RE.search(message) if '%' in message else None
             if match:
                 threshold = int(match.group(1))
             return {
-                'steps': ['Get current status', 'Dispatch to all above threshold', 'Report results'],
-                'tools': ['get_status', 'dispatch_bulk'],
+                'steps': ('Get current status', 'Dispatch to all above threshold', 'Report results'),
+                'tools': ('get_status', 'dispatch_bulk'),
                 'params': {'threshold': threshold}
             }
         elif intent_type == 'action':
             # Extract cauldron ID from message
             cauldron_id = self._extract_cauldron_id(message)
             return {
-                'steps': ['Verify target', 'Dispatch courier', 'Confirm action'],
-                'tools': ['dispatch_courier'],
+                'steps': ('Verify target', 'Dispatch courier', 'Confirm action'),
+                'tools': ('dispatch_courier',),
                 'params': {'cauldron_id': cauldron_id}
             }
-        elif intent_type == 'optimize':
-            return {
-                'steps': ['Analyze network', 'Get forecasts', 'Optimize routes', 'Validate plan'],
-                'tools': ['analyze_network', 'forecast_fills', 'optimize_routes']
-            }
-        elif intent_type == 'monitor':
-            return {
-                'steps': ['Get status', 'Detect anomalies', 'Summarize findings'],
-                'tools': ['get_status', 'detect_anomalies']
-            }
-        elif intent_type == 'analyze':
-            return {
-                'steps': ['Analyze network', 'Get status', 'Compute metrics'],
-                'tools': ['analyze_network', 'get_status']
-            }
-        elif intent_type == 'trends':
-            return {
-                'steps': ['Analyze trends', 'Get status', 'Identify patterns'],
-                'tools': ['analyze_trends', 'get_status']
-            }
-        elif intent_type == 'suggest':
-            return {
-                'steps': ['Suggest actions', 'Get status', 'Prioritize recommendations'],
-                'tools': ['suggest_actions', 'get_status', 'detect_anomalies']
-            }
-        elif intent_type == 'performance':
-            return {
-                'steps': ['Compare performance', 'Analyze trends', 'Benchmark metrics'],
-                'tools': ['compare_performance', 'analyze_trends']
-            }
-        else:
-            return {
-                'steps': ['Get status', 'Provide overview', 'Suggest next steps'],
-                'tools': ['get_status', 'suggest_actions']
-            }
+        
+        # Fixed plans (including cancellation) come straight from the table
+        return _PLAN_TABLE.get(intent_type, _DEFAULT_PLAN)
     
     def _extract_cauldron_id(self, message):
         """Extract cauldron ID from user message - uses exact match priority"""
-        import re
         msg_lower = message.lower()
         
+        index, matcher = _cauldron_lookup(factory_static_data.get('cauldrons', []))
+        
         # First try exact cauldron_XXX pattern match (e.g., "cauldron_009")
-        pattern = r'cauldron_(\d+)'
-        match = re.search(pattern, msg_lower)
+        match = _CAULDRON_ID_RE.search(msg_lower)
         if match:
             # Construct the full ID and verify it exists
-            extracted_id = f"cauldron_{match.group(1)}"
-            for cauldron in factory_static_data.get('cauldrons', []):
-                if cauldron.get('id', '').lower() == extracted_id:
-                    return cauldron.get('id')
+            cid = index.get(f"cauldron_{match.group(1)}")
+            if cid:
+                return cid
+        
+        # Fallback: check by name or partial ID match (but prefer longer matches).
+        # One scan finds every id / name word present; an id hit outranks the
+        # same cauldron's name hit, and ties keep the earlier cauldron.
+        regex, closure, entries = matcher
+        if regex is None:
+            return None
+        id_hits = set()
+        name_hits = set()
+        for m in regex.finditer(msg_lower):
+            for kind, rank in closure[m.group(1)]:
+                (id_hits if kind == 'id' else name_hits).add(rank)
         
-        # Fallback: check by name or partial ID match (but prefer longer matches)
         best_match = None
-        best_match_len = 0
-        
-        for cauldron in factory_static_data.get('cauldrons', []):
-            cid = cauldron.get('id', '')
-            name = cauldron.get('name', '')
-            
-            # Check if cauldron ID appears in message
-            if cid.lower() in msg_lower:
-                if len(cid) > best_match_len:
-                    best_match = cid
-                    best_match_len = len(cid)
-            
-            # Check if any word from cauldron name appears
-            elif any(word in msg_lower for word in name.lower().split()):
-                if len(name) > best_match_len:
-                    best_match = cid
-                    best_match_len = len(name)
+        best_key = (0, 0)
+        for rank in id_hits | name_hits:
+            cid, id_len, name_len = entries[rank]
+            weight = id_len if rank in id_hits else name_len
+            if (weight, -rank) > best_key and weight > 0:
+                best_match = cid
+                best_key = (weight, -rank)
         
         return best_match
     
@@ -910,6 +1315,10 @@ class AgentWorkflow:
     
     def _synthesize_response(self, user_message, intent, tool_results, steps):
         """Generate final response using Nemotron or fallback"""
+        if intent['type'] in _LLM_SKIP_INTENTS:
+            return self._fallback_synthesis(intent, tool_results)
+        if intent['type'] == 'action_bulk' and tool_results.get('dispatch_bulk', {}).get('status') == 'success':
+            return self._fallback_synthesis(intent, tool_results)
         if self.client:
             response = self._nemotron_synthesis(user_message, intent, tool_results, steps)
             # If Nemotron returns None or empty, use fallback
@@ -921,27 +1330,25 @@ class AgentWorkflow:
     def _nemotron_synthesis(self, user_message, intent, tool_results, steps):
         """Use Nemotron to synthesize natural language response"""
         try:
+            cache_key = _nemotron_cache_key(user_message, intent['type'], tool_results)
+            cached = _nemotron_cache_get(cache_key)
+            if cached is not None:
+                return cached
+            
             # Build context from tool results
-            context_parts = [f"User Intent: {intent['description']}"]
+            buf = io.StringIO()
+            buf.write(f"User Intent: {intent['description']}")
             for tool_name, result in tool_results.items():
-                context_parts.append(f"{tool_name}: {json.dumps(result, indent=2)}")
+                buf.write(f"\n{tool_name}: ")
+                buf.write(_dump_for_prompt(result))
             
-            context = "\n".join(context_parts)
-            
-            system_msg = (
-                "You are an intelligent factory monitoring agent with access to real-time data and tools. "
-                "Based on the tool execution results, provide a clear, actionable response to the user. "
-                "Be concise but informative. Highlight any urgent issues and recommend next steps."
-            )
+            context = buf.getvalue()
             
             prompt = f"{context}\n\nUser Question: {user_message}\n\nProvide a helpful response:"
             
-            messages = [
-                {"role": "system", "content": system_msg},
-                {"role": "user", "content": prompt}
-            ]
+            messages = [_NEMOTRON_SYSTEM_MSG, {"role": "user", "content": prompt}]
             
-            completion = self.client.chat.completions.create(
+            completion = self._create_completion(
                 model="nvidia/nvidia-nemotron-nano-9b-v2",
                 messages=messages,
                 temperature=0.6,
@@ -952,6 +1359,7 @@ class AgentWorkflow:
             if hasattr(completion.choices[0], 'message') and completion.choices[0].message:
                 content = completion.choices[0].message.content
                 if content and content.strip():
+                    _nemotron_cache_put(cache_key, content)
                     return content
                 print("[Nemotron] Empty content from message")
                 return None
@@ -976,20 +1384,15 @@ class AgentWorkflow:
                 if dispatch.get('already_empty'):
                     return f"ℹ️ **{dispatch.get('cauldron_name', 'Cauldron')} is already empty!**\n\nNo courier dispatch needed - the cauldron is at 0% capacity."
                 
-                est_min = dispatch.get('estimated_minutes', 0)
-                drain_rate = dispatch.get('drain_rate', 0)
-                current = dispatch.get('current_level', 0)
-                percent = dispatch.get('percent_full', 0)
-                max_vol = dispatch.get('max_volume', 1)
-                
-                response = f"✅ **Courier Dispatched Successfully!**\n\n"
-                response += f"• **Target:** {dispatch.get('cauldron_name', 'Unknown')}\n"
-                response += f"• **Current Level:** {current:.1f}L / {max_vol}L ({percent:.1f}% full)\n"
-                response += f"• **Drain Rate:** {drain_rate:.1f}L/min\n"
-                response += f"• **Est. Completion:** ~{est_min} minutes\n"
-                response += f"• **Dispatched:** {dispatch.get('dispatched_at', 'Now')}\n\n"
-                response += f"🚛 _The courier is now actively draining the cauldron. Watch the dashboard for real-time progress!_"
-                return response
+                return _DISPATCH_SUCCESS_TEMPLATE.format(
+                    name=dispatch.get('cauldron_name', 'Unknown'),
+                    current=dispatch.get('current_level', 0),
+                    max_vol=dispatch.get('max_volume', 1),
+                    percent=dispatch.get('percent_full', 0),
+                    drain_rate=dispatch.get('drain_rate', 0),
+                    est_min=dispatch.get('estimated_minutes', 0),
+                    dispatched_at=dispatch.get('dispatched_at', 'Now'),
+                )
             else:
                 return f"⚠️ Dispatch failed: {dispatch.get('error', 'Unknown error')}"
         
@@ -1002,42 +1405,38 @@ class AgentWorkflow:
             tickets = tool_results.get('check_tickets', {})
             anomalies = tool_results.get('detect_anomalies', {})
             
-            response = "**Investigation Complete:**\n\n"
+            parts = ["**Investigation Complete:**\n\n"]
             if 'matches' in tickets:
                 suspicious = [m for m in tickets['matches'] if m.get('suspicious')]
-                response += f"• Found **{len(suspicious)} suspicious tickets**\n"
+                parts.append(f"• Found **{len(suspicious)} suspicious tickets**\n")
             if 'anomalies' in anomalies:
-                response += f"• Detected **{anomalies['count']} anomalies**\n"
+                parts.append(f"• Detected **{anomalies['count']} anomalies**\n")
                 for a in anomalies['anomalies'][:3]:
-                    response += f"  - {a['cauldron']}: {a['details']} (severity: {a['severity']})\n"
+                    parts.append(f"  - {a['cauldron']}: {a['details']} (severity: {a['severity']})\n")
             
-            return response
+            return "".join(parts)
         
         elif intent_type == 'action_bulk':
             bulk = tool_results.get('dispatch_bulk', {})
             if bulk.get('status') == 'success':
-                dispatched = bulk.get('total_dispatched', 0)
-                draining = bulk.get('total_already_draining', 0)
-                empty = bulk.get('total_already_empty', 0)
-                threshold = bulk.get('threshold', 50)
-                
-                response = f"✅ **Bulk Courier Dispatch Complete!**\n\n"
-                response += f"• **Threshold:** {threshold}% full or more\n"
-                response += f"• **New Dispatches:** {dispatched} courier(s) sent\n"
-                response += f"• **Already Draining:** {draining} cauldron(s)\n"
-                response += f"• **Already Empty:** {empty} cauldron(s)\n\n"
+                parts = [_BULK_DISPATCH_TEMPLATE.format(
+                    threshold=bulk.get('threshold', 50),
+                    dispatched=bulk.get('total_dispatched', 0),
+                    draining=bulk.get('total_already_draining', 0),
+                    empty=bulk.get('total_already_empty', 0),
+                )]
                 
                 if bulk.get('dispatched'):
-                    response += "**Newly Dispatched:**\n"
+                    parts.append("**Newly Dispatched:**\n")
                     for d in bulk['dispatched'][:5]:
-                        response += f"  - {d['cauldron_name']}: {d['percent_full']:.1f}% → ~{d['estimated_minutes']:.0f} min\n"
+                        parts.append(f"  - {d['cauldron_name']}: {d['percent_full']:.1f}% → ~{d['estimated_minutes']:.0f} min\n")
                 
                 if bulk.get('already_draining'):
-                    response += "\n**Already Draining:**\n"
+                    parts.append("\n**Already Draining:**\n")
                     for d in bulk['already_draining'][:3]:
-                        response += f"  - {d['cauldron_name']}: {d['progress']:.1f}% complete\n"
+                        parts.append(f"  - {d['cauldron_name']}: {d['progress']:.1f}% complete\n")
                 
-                return response
+                return "".join(parts)
             else:
                 return f"⚠️ Bulk dispatch failed: {bulk.get('error', 'Unknown error')}"
         
@@ -1045,10 +1444,10 @@ class AgentWorkflow:
             forecasts = tool_results.get('forecast_fills', [])
             if isinstance(forecasts, list) and len(forecasts) > 0:
                 urgent = [f for f in forecasts if f.get('time_to_full_min', 9999) < 30]
-                response = f"**Forecast Analysis:**\n\n• {len(urgent)} cauldrons will overflow within 30 minutes\n"
+                parts = [f"**Forecast Analysis:**\n\n• {len(urgent)} cauldrons will overflow within 30 minutes\n"]
                 for f in urgent[:5]:
-                    response += f"  - {f.get('name')}: {f.get('time_to_full_min')} min\n"
-                return response
+                    parts.append(f"  - {f.get('name')}: {f.get('time_to_full_min')} min\n")
+                return "".join(parts)
             return "✓ No urgent overflow risks detected"
         
         elif intent_type == 'action':
@@ -1062,34 +1461,24 @@ class AgentWorkflow:
                 
                 # Check if already draining
                 if dispatch.get('already_draining'):
-                    progress = dispatch.get('drain_progress', 0)
-                    elapsed = dispatch.get('elapsed_minutes', 0)
-                    current = dispatch.get('current_level', 0)
-                    initial = dispatch.get('initial_level', 0)
-                    drain_rate = dispatch.get('drain_rate', 0)
-                    
-                    response = f"🚛 **Courier Already Draining {dispatch.get('cauldron_name', 'Cauldron')}!**\n\n"
-                    response += f"• **Progress:** {progress:.1f}% drained\n"
-                    response += f"• **Remaining:** {current:.1f}L (started at {initial:.1f}L)\n"
-                    response += f"• **Time Elapsed:** {elapsed:.1f} minutes\n"
-                    response += f"• **Drain Rate:** {drain_rate:.1f}L/min\n\n"
-                    response += f"_The drain is ongoing. Check the dashboard for real-time updates!_"
-                    return response
+                    return _ALREADY_DRAINING_TEMPLATE.format(
+                        name=dispatch.get('cauldron_name', 'Cauldron'),
+                        progress=dispatch.get('drain_progress', 0),
+                        current=dispatch.get('current_level', 0),
+                        initial=dispatch.get('initial_level', 0),
+                        elapsed=dispatch.get('elapsed_minutes', 0),
+                        drain_rate=dispatch.get('drain_rate', 0),
+                    )
                 
-                est_min = dispatch.get('estimated_minutes', 0)
-                drain_rate = dispatch.get('drain_rate', 0)
-                current = dispatch.get('current_level', 0)
-                percent = dispatch.get('percent_full', 0)
-                max_vol = dispatch.get('max_volume', 1)
-                
-                response = f"✅ **Courier Dispatched Successfully!**\n\n"
-                response += f"• **Target:** {dispatch.get('cauldron_name', 'Unknown')}\n"
-                response += f"• **Current Level:** {current:.1f}L / {max_vol}L ({percent:.1f}% full)\n"
-                response += f"• **Drain Rate:** {drain_rate:.1f}L/min\n"
-                response += f"• **Est. Completion:** ~{est_min:.1f} minutes\n"
-                response += f"• **Dispatched:** {dispatch.get('dispatched_at', 'Now')}\n\n"
-                response += f"🚛 _The courier is now actively draining the cauldron. Watch the dashboard for real-time progress!_"
-                return response
+                return _DISPATCH_SUCCESS_TEMPLATE.format(
+                    name=dispatch.get('cauldron_name', 'Unknown'),
+                    current=dispatch.get('current_level', 0),
+                    max_vol=dispatch.get('max_volume', 1),
+                    percent=dispatch.get('percent_full', 0),
+                    drain_rate=dispatch.get('drain_rate', 0),
+                    est_min=format(dispatch.get('estimated_minutes', 0), '.1f'),
+                    dispatched_at=dispatch.get('dispatched_at', 'Now'),
+                )
             elif 'error' in dispatch:
                 return f"⚠️ **Dispatch Failed**\n\nError: {dispatch.get('error')}\n\n**Troubleshooting:**\n1. Verify cauldron ID is correct\n2. Check system connectivity\n3. Retry the operation\n4. If issue persists, contact support"
             return "Dispatch operation completed"
@@ -1103,16 +1492,17 @@ class AgentWorkflow:
         elif intent_type == 'suggest':
             suggestions = tool_results.get('suggest_actions', {})
             if suggestions.get('count', 0) > 0:
-                response = f"**Recommendations ({suggestions['count']} total):**\n\n"
-                urgent = [s for s in suggestions.get('suggestions', []) if s['priority'] == 'URGENT']
-                high = [s for s in suggestions.get('suggestions', []) if s['priority'] == 'HIGH']
+                parts = [f"**Recommendations ({suggestions['count']} total):**\n\n"]
+                by_prio = _suggestions_by_priority(suggestions)
+                urgent = by_prio.get('URGENT', ())
+                high = by_prio.get('HIGH', ())
                 
                 if urgent:
-                    response += "🚨 **URGENT:**\n"
+                    parts.append("🚨 **URGENT:**\n")
                     for s in urgent[:3]:
-                        response += f"  - {s['reason']}\n"
+                        parts.append(f"  - {s['reason']}\n")
                         if s['action'] == 'dispatch_courier' and s['cauldron']:
-                            response += f"    → Would you like me to dispatch a courier to **{s['cauldron']}** now?\n"
+                            parts.append(f"    → Would you like me to dispatch a courier to **{s['cauldron']}** now?\n")
                             # Set pending action
                             self.pending_action = {
                                 'action': 'dispatch_courier',
@@ -1120,14 +1510,14 @@ class AgentWorkflow:
                             }
                 
                 if high:
-                    response += "\n⚠️ **HIGH PRIORITY:**\n"
+                    parts.append("\n⚠️ **HIGH PRIORITY:**\n")
                     for s in high[:3]:
-                        response += f"  - {s['reason']}\n"
+                        parts.append(f"  - {s['reason']}\n")
                 
                 if self.pending_action:
-                    response += "\n💬 _Reply 'yes' to confirm or 'no' to cancel._"
+                    parts.append("\n💬 _Reply 'yes' to confirm or 'no' to cancel._")
                 
-                return response
+                return "".join(parts)
             return "✓ No urgent actions needed at this time"
         
         elif intent_type == 'performance':
@@ -1135,16 +1525,16 @@ class AgentWorkflow:
             if perf:
                 status = perf.get('performance_status', 'UNKNOWN')
                 icon = '🔴' if status == 'CRITICAL' else '🟡' if status == 'WARNING' else '🟢'
-                response = f"{icon} **System Performance: {status}**\n\n"
-                response += f"• Overall Utilization: {perf.get('system_utilization', 0)}%\n"
-                response += f"• Total Capacity: {perf.get('total_capacity', 0)}L\n"
-                response += f"• Current Volume: {perf.get('current_volume', 0)}L\n"
+                parts = [f"{icon} **System Performance: {status}**\n\n"]
+                parts.append(f"• Overall Utilization: {perf.get('system_utilization', 0)}%\n")
+                parts.append(f"• Total Capacity: {perf.get('total_capacity', 0)}L\n")
+                parts.append(f"• Current Volume: {perf.get('current_volume', 0)}L\n")
                 risk = perf.get('risk_distribution', {})
-                response += f"\n**Risk Distribution:**\n"
-                response += f"  - High Risk: {risk.get('high', 0)} cauldrons\n"
-                response += f"  - Medium Risk: {risk.get('medium', 0)} cauldrons\n"
-                response += f"  - Low Risk: {risk.get('low', 0)} cauldrons\n"
-                return response
+                parts.append(f"\n**Risk Distribution:**\n")
+                parts.append(f"  - High Risk: {risk.get('high', 0)} cauldrons\n")
+                parts.append(f"  - Medium Risk: {risk.get('medium', 0)} cauldrons\n")
+                parts.append(f"  - Low Risk: {risk.get('low', 0)} cauldrons\n")
+                return "".join(parts)
             return "Performance metrics retrieved"
         
         elif intent_type == 'trends':
@@ -1152,14 +1542,14 @@ class AgentWorkflow:
             if trends.get('total', 0) > 0:
                 critical = [t for t in trends.get('trends', []) if t['trend'] == 'critical']
                 rising = [t for t in trends.get('trends', []) if t['trend'] == 'rising']
-                response = f"**Trend Analysis ({trends['total']} cauldrons):**\n\n"
+                parts = [f"**Trend Analysis ({trends['total']} cauldrons):**\n\n"]
                 if critical:
-                    response += f"🔴 **Critical Trends:** {len(critical)} cauldrons\n"
+                    parts.append(f"🔴 **Critical Trends:** {len(critical)} cauldrons\n")
                     for t in critical[:3]:
-                        response += f"  - {t['name']}: {t['current_level']:.1f}% ({t['trend']})\n"
+                        parts.append(f"  - {t['name']}: {t['current_level']:.1f}% ({t['trend']})\n")
                 if rising:
-                    response += f"\n🟡 **Rising Trends:** {len(rising)} cauldrons\n"
-                return response
+                    parts.append(f"\n🟡 **Rising Trends:** {len(rising)} cauldrons\n")
+                return "".join(parts)
             return "Trend analysis complete"
         
         else:
@@ -1172,22 +1562,22 @@ class AgentWorkflow:
                 critical = len([c for c in status if c.get('percent_full', 0) > 90])
                 draining = [c for c in status if c.get('is_draining')]
                 
-                response = f"**Factory Status:**\n\n• {total} cauldrons monitored\n• {critical} at critical fill levels (>90%)\n"
+                parts = [f"**Factory Status:**\n\n• {total} cauldrons monitored\n• {critical} at critical fill levels (>90%)\n"]
                 
                 # Show draining cauldrons
                 if draining:
-                    response += f"• 🚛 {len(draining)} courier{'s' if len(draining) > 1 else ''} actively draining\n"
+                    parts.append(f"• 🚛 {len(draining)} courier{'s' if len(draining) > 1 else ''} actively draining\n")
                     for c in draining[:2]:
                         progress = c.get('drain_progress', 0)
-                        response += f"  - **{c.get('name')}**: {progress:.1f}% drained (current: {c.get('current_level', 0):.1f}L)\n"
+                        parts.append(f"  - **{c.get('name')}**: {progress:.1f}% drained (current: {c.get('current_level', 0):.1f}L)\n")
                 
                 # Add urgent suggestions if available
                 if suggestions.get('count', 0) > 0:
-                    urgent = [s for s in suggestions.get('suggestions', []) if s['priority'] == 'URGENT']
+                    urgent = _suggestions_by_priority(suggestions).get('URGENT', ())
                     if urgent:
-                        response += f"\n🚨 **{len(urgent)} urgent issue{'s' if len(urgent) > 1 else ''}:**\n"
+                        parts.append(f"\n🚨 **{len(urgent)} urgent issue{'s' if len(urgent) > 1 else ''}:**\n")
                         for s in urgent[:2]:
-                            response += f"  - {s['reason']}\n"
+                            parts.append(f"  - {s['reason']}\n")
                             if s['action'] == 'dispatch_courier' and s['cauldron']:
                                 # Set pending action for first urgent item
                                 if not self.pending_action:
@@ -1195,19 +1585,49 @@ class AgentWorkflow:
                                         'action': 'dispatch_courier',
                                         'cauldron_id': s['cauldron']
                                     }
-                                    response += f"\n💬 Would you like me to dispatch a courier to **{s['cauldron']}** now? (Reply 'yes' or 'no')"
+                                    parts.append(f"\n💬 Would you like me to dispatch a courier to **{s['cauldron']}** now? (Reply 'yes' or 'no')")
                                     break
                 
                 if not self.pending_action:
-                    response += "\n\n_Ask me for suggestions, trends, or specific actions!_"
+                    parts.append("\n\n_Ask me for suggestions, trends, or specific actions!_")
                 
-                return response
+                return "".join(parts)
             return "Status check complete"
 
 # --- Setup ---
 app = Flask(__name__)
 CORS(app) 
 
+# Non-string dict keys serialize directly instead of falling back to the
+# stdlib encoder
+_ORJSON_RESPONSE_OPTS = orjson.OPT_NON_STR_KEYS if _HAS_ORJSON else 0
+
+def ojsonify(obj):
+    """jsonify() via orjson when available; falls back for types orjson rejects"""
+    if _HAS_ORJSON:
+        try:
+            return app.response_class(orjson.dumps(obj, option=_ORJSON_RESPONSE_OPTS), mimetype='application/json')
+        except TypeError:
+            pass
+    return jsonify(obj)
+
+def _wants_ndjson():
+    """True when the client asked for a streamed NDJSON body (?stream=1 or Accept)"""
+    return request.args.get('stream') == '1' or 'application/x-ndjson' in request.headers.get('Accept', '')
+
+def ndjson_response(items):
+    """Stream an iterable as newline-delimited JSON, one object per line"""
+    def generate():
+        for item in items:
+            if _HAS_ORJSON:
+                try:
+                    yield orjson.dumps(item, option=_ORJSON_RESPONSE_OPTS) + b'\n'
+                    continue
+                except TypeError:
+                    pass
+            yield json.dumps(item, separators=(',', ':'), default=str).encode() + b'\n'
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 # Session configuration. If SECRET_KEY is not set, use an ephemeral key for
 # local development (but warn loudly).
 app.secret_key = os.environ.get("SECRET_KEY")
@@ -1217,6 +1637,11 @@ if not app.secret_key:
 
 # If authlib is available and Auth0 env vars exist, register OAuth. Otherwise
 # provide no-op/dummy routes so the app remains runnable in development.
+if _HAVE_AUTHLIB and os.environ.get("AUTH0_DOMAIN"):
+    try:
+        from authlib.integrations.flask_client import OAuth
+    except Exception:
+        _HAVE_AUTHLIB = False
 if _HAVE_AUTHLIB and os.environ.get("AUTH0_DOMAIN"):
     oauth = OAuth(app)
     oauth.register(
@@ -1309,38 +1734,20 @@ else:
             return redirect(url_for('dashboard'))
         return jsonify({'error': 'Dev login not enabled. Set ALLOW_DEV_LOGIN=1 in environment.'}), 403
 
-# Load local .env if python-dotenv is installed. This is optional and safe.
-if _HAVE_DOTENV:
-    try:
-        # Use find_dotenv if available to locate the .env file in the repo tree
-        dotenv_mod = importlib.import_module('dotenv')
-        find_dotenv = getattr(dotenv_mod, 'find_dotenv', None)
-        if callable(load_dotenv) and callable(find_dotenv):
-            env_path = find_dotenv()
-            if env_path:
-                load_dotenv(env_path)
-                # Don't print the key, just report presence
-                if os.environ.get('NV_API_KEY') or os.environ.get('nv_api_key'):
-                    print('[env] .env loaded and NV_API_KEY found (hidden)')
-            else:
-                # fallback to calling load_dotenv() which will try default filename
-                load_dotenv()
-                if os.environ.get('NV_API_KEY') or os.environ.get('nv_api_key'):
-                    print('[env] .env loaded (default) and NV_API_KEY found (hidden)')
-        elif callable(load_dotenv):
-            # Fallback: call load_dotenv without explicit path
-            load_dotenv()
-            if os.environ.get('NV_API_KEY') or os.environ.get('nv_api_key'):
-                print('[env] .env loaded (fallback) and NV_API_KEY found (hidden)')
-    except Exception as e:
-        # Don't crash the app for dotenv issues; just log them
-        print('[env] dotenv load failed:', e)
+# The local .env (if any) was loaded at the top of the module. Don't print
+# the key, just report presence.
+if _DOTENV_LOADED and (os.environ.get('NV_API_KEY') or os.environ.get('nv_api_key')):
+    print('[env] .env loaded and NV_API_KEY found (hidden)')
 
 # Expose a normalized environment lookup for NV API key. Accept either
 # uppercase `NV_API_KEY` or lowercase `nv_api_key` (some users set envs in
 # different case-sensitive shells). This helper avoids duplicating logic.
+# The environment does not change for the life of a worker, so resolve it once.
+_NV_API_KEY = os.environ.get('NV_API_KEY') or os.environ.get('nv_api_key') or os.environ.get('NVIDIA_API_KEY')
+
 def _get_nv_api_key_from_env():
-    return os.environ.get('NV_API_KEY') or os.environ.get('nv_api_key')
+    """Retrieve NVIDIA API key from environment variables."""
+    return _NV_API_KEY
 # Lightweight auth status endpoint (does not expose secrets)
 @app.route('/auth/status')
 def auth_status():
@@ -1392,6 +1799,17 @@ def _parse_timestamp(ts_str):
     """Parse ISO-like timestamps returned by the EOG API. Supports trailing Z."""
     if not ts_str:
         return None
+    if isinstance(ts_str, str):
+        return _parse_timestamp_str(ts_str)
+    return _parse_timestamp_uncached(ts_str)
+
+# History walks see the same timestamp strings on every refresh; datetimes are
+# immutable, so the parsed values can be shared
+@lru_cache(maxsize=131072)
+def _parse_timestamp_str(ts_str):
+    return _parse_timestamp_uncached(ts_str)
+
+def _parse_timestamp_uncached(ts_str):
     try:
         # Handle trailing Z
         if ts_str.endswith('Z'):
@@ -1404,25 +1822,23 @@ def _parse_timestamp(ts_str):
         except Exception:
             return None
 
-def _compute_rates_from_history(sample_limit=500):
-    """Analyze the recent /api/Data time-series and compute per-cauldron
-    median fill and drain rates (liters per minute).
-    Returns a dict: { cauldron_id: {'fill_rate_per_min': x, 'drain_rate_per_min': y} }
-    """
-    try:
-        # Request the full historic range per the challenge guidance so rate computation
-        # uses minute-by-minute samples across the whole dataset when possible.
-        raw = safe_get(EOG_API_BASE_URL + '/api/Data?start_date=0&end_date=2000000000', timeout=20) or []
-    except Exception:
-        return {}
+# How long one /api/Data payload is shared between the dashboard poll and the
+# other routes that read it
+LIVE_DATA_CACHE_TTL = 4.0  # seconds
 
-    # API returns array directly according to documentation
-    data_list = raw if isinstance(raw, list) else []
-    # Keep only the last N samples
-    if not data_list:
-        return {}
-    # If time-series shape (records with 'timestamp' and 'cauldron_levels')
-    # then extract timestamps and per-cauldron values
+# Rolling buffer of parsed /api/Data history records, [(timestamp, levels)],
+# so rate refreshes only fetch records newer than the last one seen
+HISTORY_BUFFER_MAX = 10000
+_history_records = []
+_history_last_ts = None
+_history_lock = threading.Lock()
+
+# Last computed rates keyed on the window they came from, so refresh ticks
+# that brought no new records reuse them instead of recomputing
+_rates_cache = (None, None)
+
+def _parse_history_records(data_list):
+    """Parse time-series records into [(datetime, levels_dict)], skipping bad rows"""
     records = []
     for rec in data_list:
         if not isinstance(rec, dict):
@@ -1445,19 +1861,298 @@ def _compute_rates_from_history(sample_limit=500):
         if not isinstance(levels, dict):
             continue
         records.append((parsed, levels))
+    return records
 
-    if not records:
-        return {}
-
-    # Use the last `sample_limit` records
-    records = records[-sample_limit:]
+def _fetch_history():
+    """Append /api/Data records newer than the buffer and return a snapshot of it.
 
-    # Build per-cauldron time-ordered series
-    per_series = {}
-    for ts, levels in records:
-        for cid, v in levels.items():
+    The first call requests the full historic range; later calls ask only for
+    records from the last seen timestamp on.
+    """
+    global _history_last_ts
+    with _history_lock:
+        last_ts = _history_last_ts
+    start = 0 if last_ts is None else int(last_ts)
+    raw = safe_get(EOG_API_BASE_URL + f'/api/Data?start_date={start}&end_date=2000000000', timeout=20)
+    # API returns array directly according to documentation
+    new_records = _parse_history_records(raw) if isinstance(raw, list) else []
+    with _history_lock:
+        if _history_last_ts is not None:
+            new_records = [r for r in new_records if r[0].timestamp() > _history_last_ts]
+        if new_records:
+            _history_records.extend(new_records)
+            del _history_records[:-HISTORY_BUFFER_MAX]
+            newest = max(r[0].timestamp() for r in new_records)
+            _history_last_ts = newest if _history_last_ts is None else max(_history_last_ts, newest)
+        return list(_history_records)
+
+# Full /api/Data payload plus its per-cauldron series, shared by the ticket
+# matching and historic routes so repeat requests skip the fetch and parse
+SERIES_CACHE_TTL = 15.0  # seconds
+# One entry per refill: {'computed_at', 'raw', 'series_map', 'drains',
+# 'time_index'}. A refill swaps in a new dict, so readers holding an entry see
+# consistent fields; 'drains' and 'time_index' are filled in on first use.
+_data_cache = None
+_data_cache_lock = threading.RLock()
+
+def _build_series_map(data_list):
+    """Build {cauldron_id: {'t', 'v', 'day'}} column series sorted by time.
+
+    't' holds the datetimes, 'v' the levels and 'day' each sample's date
+    ordinal, each as a list.
+    """
+    series_map = {}
+    for rec in data_list:
+        if not isinstance(rec, dict):
+            continue
+        ts = _parse_timestamp(rec.get('timestamp') or rec.get('time') or rec.get('t'))
+        if ts is None:
+            continue
+        levels = rec.get('cauldron_levels') or rec.get('levels') or {}
+        if not isinstance(levels, dict):
+            continue
+        for cid, val in levels.items():
             try:
-                num = float(v)
+                v = float(val)
+            except Exception:
+                continue
+            series_map.setdefault(cid, []).append((ts, v))
+    for cid, pairs in series_map.items():
+        pairs.sort(key=lambda x: x[0])
+        times = [p[0] for p in pairs]
+        values = [p[1] for p in pairs]
+        days = [t.toordinal() for t in times]
+        series_map[cid] = {'t': times, 'v': values, 'day': days}
+    return series_map
+
+def _get_data_and_series(ttl=SERIES_CACHE_TTL):
+    """Return (data_list, series_map) for /api/Data, or (None, None) if the fetch fails.
+
+    Both are shared between requests and must be treated as read-only.
+    """
+    global _data_cache
+    entry = _data_cache
+    if entry is not None and time.monotonic() - entry['computed_at'] < ttl:
+        return entry['raw'], entry['series_map']
+    with _data_cache_lock:
+        # another thread may have refreshed it while we waited
+        entry = _data_cache
+        if entry is not None and time.monotonic() - entry['computed_at'] < ttl:
+            return entry['raw'], entry['series_map']
+        raw = safe_get(EOG_API_BASE_URL + '/api/Data', timeout=10, cache_ttl=LIVE_DATA_CACHE_TTL)
+        if raw is None:
+            return None, None
+        # API returns array directly according to documentation
+        data_list = raw if isinstance(raw, list) else []
+        series_map = _build_series_map(data_list)
+        _data_cache = {'computed_at': time.monotonic(), 'raw': data_list, 'series_map': series_map,
+                       'drains': None, 'time_index': None}
+        return data_list, series_map
+
+def _data_cache_fresh(ttl=SERIES_CACHE_TTL):
+    """True when _get_data_and_series() would be served from the cache"""
+    entry = _data_cache
+    return entry is not None and time.monotonic() - entry['computed_at'] < ttl
+
+# Loads /api/Data in the background while a route fetches its tickets
+_data_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='data-prefetch')
+
+def _build_time_index(data_list):
+    """Return (sorted_times, record_indices) for every record with a timestamp.
+
+    Naive timestamps are taken as UTC so all of them compare against each other.
+    """
+    keyed = []
+    for idx, rec in enumerate(data_list):
+        if not isinstance(rec, dict):
+            continue
+        ts = _parse_timestamp(rec.get('timestamp') or rec.get('time') or rec.get('t'))
+        if ts is None:
+            continue
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        keyed.append((ts, idx))
+    keyed.sort(key=lambda x: x[0])
+    return [k[0] for k in keyed], [k[1] for k in keyed]
+
+def _get_data_time_index(ttl=SERIES_CACHE_TTL):
+    """Return (data_list, sorted_times, record_indices), or (None, None, None) if the fetch fails"""
+    data_list, _ = _get_data_and_series(ttl)
+    if data_list is None:
+        return None, None, None
+    entry = _data_cache
+    if entry is None or entry['raw'] is not data_list:
+        return (data_list,) + _build_time_index(data_list)
+    if entry['time_index'] is None:
+        with _data_cache_lock:
+            if entry['time_index'] is None:
+                entry['time_index'] = _build_time_index(data_list)
+    return (data_list,) + entry['time_index']
+
+def _drop_starts(values):
+    """Indices k where values[k+1] < values[k], i.e. where a drain can begin"""
+    return [k for k in range(len(values) - 1) if values[k + 1] < values[k]]
+
+def _decreasing_runs(values):
+    """Return [(start_idx, end_idx)] for every maximal strictly decreasing run"""
+    runs = []
+    i, n = 0, len(values)
+    while i < n - 1:
+        if values[i + 1] < values[i]:
+            j = i + 1
+            while j + 1 < n and values[j + 1] < values[j]:
+                j += 1
+            runs.append((i, j))
+            i = j + 1
+        else:
+            i += 1
+    return runs
+
+def _detect_drains(times, values, fill_rate, max_dur=10, max_amt=110):
+    """Detect drain events in one cauldron's time-sorted series.
+
+    Returns [(day_key, event)]. Stretches with no drop are skipped by jumping
+    straight to the next index where the level falls; from there a drain
+    tolerates small fill-rate bumps and short plateaus, and is split once it
+    lasts longer than max_dur minutes or drains more than max_amt litres so
+    separate courier visits are not merged.
+    """
+    starts = _drop_starts(values)
+    n = len(values)
+    drains = []
+    i = 0
+    for s in starts:
+        if s < i:
+            continue
+        start_t = times[s]
+        start_v = values[s]
+        end_t = times[s + 1]
+        end_v = values[s + 1]
+        j = s + 2
+        consecutive_increases = 0
+        consecutive_stable = 0
+        while j < n:
+            prev_v = values[j - 1]
+            curr_v = values[j]
+            curr_t = times[j]
+            duration_so_far = (curr_t - start_t).total_seconds() / 60.0
+            if duration_so_far > max_dur or start_v - curr_v > max_amt:
+                break
+            # If actively decreasing (by >0.5L), continue
+            if curr_v < prev_v - 0.5:
+                end_t = curr_t
+                end_v = curr_v
+                consecutive_increases = 0
+                consecutive_stable = 0
+                j += 1
+            # Allow small increases (fill_rate) but limit them
+            elif curr_v > prev_v and consecutive_increases < 2:
+                consecutive_increases += 1
+                consecutive_stable = 0
+                j += 1
+            # Allow stable/near-stable points but limit them
+            elif abs(curr_v - prev_v) <= 0.5 and consecutive_stable < 3:
+                consecutive_stable += 1
+                j += 1
+            else:
+                break
+        i = j
+
+        duration_min = (end_t - start_t).total_seconds() / 60.0
+        drained = max(0.0, start_v - end_v)
+        # Only record as drain if significant (>1L drained) to filter extreme noise
+        if drained > 1:
+            # account for potion generated during drain
+            drained_adjusted = drained + (fill_rate * duration_min)
+            drains.append((start_t.date().isoformat(), {
+                'start': start_t.isoformat(),
+                'end': end_t.isoformat(),
+                'start_v': start_v,
+                'end_v': end_v,
+                'duration_min': round(duration_min, 1),
+                'drained': round(drained_adjusted, 2)
+            }))
+    return drains
+
+def _day_drop_total(series, day_ordinal):
+    """Sum the level drops between consecutive samples that both fall on one day"""
+    values = series['v']
+    days = series['day']
+    s = 0.0
+    for i in range(len(values) - 1):
+        if days[i] == day_ordinal and days[i + 1] == day_ordinal and values[i + 1] < values[i]:
+            s += values[i] - values[i + 1]
+    return s
+
+def _detect_all_drains(series_map):
+    """Return {(cauldron_id, day): [event, ...]} for every cauldron series"""
+    by_day = {}
+    for cid, series in series_map.items():
+        static = _CAULDRONS_BY_ID.get(cid)
+        fill_rate = static.get('fill_rate_per_min', 0) if static else 0
+        for day_key, event in _detect_drains(series['t'], series['v'], fill_rate):
+            by_day.setdefault((cid, day_key), []).append(event)
+    return by_day
+
+def _drains_by_cauldron_day(series_map):
+    """Return the drain events for series_map, detected once per cache refill.
+
+    Concurrent callers wait for the first detection instead of repeating it.
+    """
+    entry = _data_cache
+    if entry is None or entry['series_map'] is not series_map:
+        return _detect_all_drains(series_map)
+    if entry['drains'] is None:
+        with _data_cache_lock:
+            if entry['drains'] is None:
+                entry['drains'] = _detect_all_drains(series_map)
+    return entry['drains']
+
+def _rate_stats(vals):
+    """Return (min, max, mean, median) of a list of rates, all 0.0 when empty.
+
+    The median is the robust central tendency used for rates; it falls back
+    to the mean.
+    """
+    n = len(vals)
+    if n == 0:
+        return (0.0, 0.0, 0.0, 0.0)
+    mean = sum(vals) / n
+    try:
+        med = float(statistics.median(vals))
+    except Exception:
+        med = float(mean)
+    return (float(min(vals)), float(max(vals)), float(mean), med)
+
+def _compute_rates_from_history(sample_limit=500):
+    """Analyze the recent /api/Data time-series and compute per-cauldron
+    median fill and drain rates (liters per minute).
+    Returns a dict: { cauldron_id: {'fill_rate_per_min': x, 'drain_rate_per_min': y} }
+    """
+    try:
+        # The buffer is seeded from the full historic range per the challenge
+        # guidance, then kept current with incremental fetches.
+        records = _fetch_history()
+    except Exception:
+        return {}
+
+    if not records:
+        return {}
+
+    global _rates_cache
+    window_key = (sample_limit, len(records), records[-1][0])
+    if _rates_cache[0] == window_key:
+        return _rates_cache[1]
+
+    # Use the last `sample_limit` records
+    records = records[-sample_limit:]
+
+    # Build per-cauldron time-ordered series
+    per_series = {}
+    for ts, levels in records:
+        for cid, v in levels.items():
+            try:
+                num = float(v)
             except Exception:
                 continue
             per_series.setdefault(cid, []).append((ts, num))
@@ -1480,32 +2175,25 @@ def _compute_rates_from_history(sample_limit=500):
             elif rate < 0:
                 drain_rates.append(abs(rate))
 
-        # robust central tendency: median when possible, else mean, else 0
-        def choose(vals):
-            if not vals:
-                return 0.0
-            try:
-                return float(statistics.median(vals))
-            except Exception:
-                try:
-                    return float(sum(vals)/len(vals))
-                except Exception:
-                    return 0.0
-
-        fill_r = choose(fill_rates)
-        drain_r = choose(drain_rates)
+        fill_min, fill_max, fill_mean, fill_r = _rate_stats(fill_rates)
+        drain_min, drain_max, drain_mean, drain_r = _rate_stats(drain_rates)
 
         # Enforce reasonable bounds to avoid wild numbers
-        if fill_r < 0 or fill_r > 1000:
-            fill_r = 0.0
-        if drain_r < 0 or drain_r > 5000:
-            drain_r = 0.0
+        fill_r = fill_r if 0 <= fill_r <= 1000 else 0.0
+        drain_r = drain_r if 0 <= drain_r <= 5000 else 0.0
 
         rates[cid] = {
             'fill_rate_per_min': round(fill_r, 3),
-            'drain_rate_per_min': round(drain_r, 3)
+            'drain_rate_per_min': round(drain_r, 3),
+            'fill_rate_min': round(fill_min, 3),
+            'fill_rate_max': round(fill_max, 3),
+            'fill_rate_mean': round(fill_mean, 3),
+            'drain_rate_min': round(drain_min, 3),
+            'drain_rate_max': round(drain_max, 3),
+            'drain_rate_mean': round(drain_mean, 3)
         }
 
+    _rates_cache = (window_key, rates)
     return rates
 
 # --- NEW: Load ALL Static Data from the API on Startup ---
@@ -1545,6 +2233,7 @@ def load_static_factory_data():
         except Exception:
             computed = {}
 
+        rate_objs = []
         for c in cauldrons:
             cid = c.get('id')
             rate_obj = None
@@ -1552,15 +2241,48 @@ def load_static_factory_data():
                 rate_obj = meta_rates.get(cid)
             elif cid and cid in computed:
                 rate_obj = computed.get(cid)
+            rate_objs.append(rate_obj)
+
+        # Last-ditch per-cauldron metadata queries are independent, so issue
+        # them concurrently rather than one round trip after another
+        def _probe_metadata(cid):
+            try:
+                return safe_get(EOG_API_BASE_URL + f"/api/Data/metadata?cauldronId={cid}", timeout=5)
+            except Exception:
+                return None
+        need = [c.get('id') for c, rate_obj in zip(cauldrons, rate_objs) if not isinstance(rate_obj, dict)]
+        per_metas = {}
+        if len(need) > 1:
+            # Try one batched query first; a server that understands
+            # cauldronIds= answers with a per-cauldron map and saves the per-id calls
+            bulk = None
+            try:
+                ids_param = quote_plus(','.join(str(cid) for cid in need))
+                bulk = safe_get(EOG_API_BASE_URL + f"/api/Data/metadata?cauldronIds={ids_param}", timeout=5)
+            except Exception:
+                bulk = None
+            if isinstance(bulk, dict):
+                for key in ('cauldron_rates', 'rates', 'fill_rates', 'per_cauldron'):
+                    if key in bulk and isinstance(bulk[key], dict):
+                        for cid in need:
+                            if isinstance(bulk[key].get(cid), dict):
+                                per_metas[cid] = {key: {cid: bulk[key][cid]}}
+                        break
+            need = [cid for cid in need if cid not in per_metas]
+        if need:
+            with ThreadPoolExecutor(max_workers=16, thread_name_prefix='metadata-probe') as ex:
+                per_metas.update(zip(need, ex.map(_probe_metadata, need)))
 
+        for c, rate_obj in zip(cauldrons, rate_objs):
+            cid = c.get('id')
             if isinstance(rate_obj, dict):
                 c['fill_rate_per_min'] = float(rate_obj.get('fill_rate_per_min', rate_obj.get('fill_rate', 0)))
                 c['drain_rate_per_min'] = float(rate_obj.get('drain_rate_per_min', rate_obj.get('drain_rate', 0)))
             else:
-                # Last-ditch: try a per-cauldron metadata query before falling back.
+                # Last-ditch: use the per-cauldron metadata query before falling back.
                 per_rate = None
                 try:
-                    per_meta = safe_get(EOG_API_BASE_URL + f"/api/Data/metadata?cauldronId={cid}", timeout=5)
+                    per_meta = per_metas.get(cid)
                     # metadata may contain nested maps like {'cauldron_rates': {cid: {...}}}
                     if isinstance(per_meta, dict):
                         for key in ('cauldron_rates', 'rates', 'fill_rates', 'per_cauldron'):
@@ -1696,6 +2418,12 @@ def _refresh_rates_periodically(interval_seconds=60):
     t.start()
 
 
+# Repeated /api/compute_rates calls within this window share the last result
+# instead of each triggering a history fetch and recompute
+RATES_RECOMPUTE_COOLDOWN = 30.0  # seconds
+_compute_rates_last = {'ts': None, 'val': {}}
+_compute_rates_lock = threading.Lock()
+
 @app.route('/api/compute_rates')
 @requires_auth
 def api_compute_rates():
@@ -1703,7 +2431,15 @@ def api_compute_rates():
     Returns the computed rates (may be empty if history insufficient).
     """
     try:
-        computed = _compute_rates_from_history()
+        with _compute_rates_lock:
+            now = time.monotonic()
+            last_ts = _compute_rates_last['ts']
+            if last_ts is not None and now - last_ts < RATES_RECOMPUTE_COOLDOWN:
+                return jsonify({'computed': _compute_rates_last['val'], 'cached': True})
+            computed = _compute_rates_from_history()
+            # An empty result (no history yet) must not hold off the retry
+            if computed:
+                _compute_rates_last.update(ts=now, val=computed)
         if computed:
             for c in factory_static_data.get('cauldrons', []):
                 cid = c.get('id')
@@ -1732,15 +2468,20 @@ if factory_static_data is None:
         "couriers": []
     }
 
+# id -> static cauldron record. The rate refresher updates these dicts in
+# place, so the index stays valid without rebuilding.
+_CAULDRONS_BY_ID = {c['id']: c for c in factory_static_data.get('cauldrons', []) if c.get('id')}
+bump_cauldron_registry()
+
 # Clear any active drains on startup (fresh start)
 print("[init] Clearing all active drains (fresh app start)")
 with drains_lock:
-    active_drains.clear()
+    active_drains = {}
 with resolved_tickets_lock:
     resolved_tickets.clear()
 
-# Global set to track cauldrons with suspicious tickets (populated by /api/tickets/match)
-suspicious_cauldrons = set()
+# Global set to track cauldrons with suspicious tickets (replaced wholesale by /api/tickets/match)
+suspicious_cauldrons = frozenset()
 
 # Server-side forecast smoothing state to avoid large upward jumps in full_at
 forecast_state = {}
@@ -1753,26 +2494,34 @@ except Exception:
 
 # --- EOG Challenge: Tool Definitions (API Endpoints) ---
 
-@app.route('/api/cauldron/levels')
-@requires_auth
-def get_cauldron_levels():
-    """
-    Tool: Gets the current level of all cauldrons.
-    This is called by the dashboard every 5 seconds.
+# Key names probed in /api/Data responses, in precedence order
+_LEVEL_WRAPPER_KEYS = ('data', 'items', 'results', 'value')
+_LEVEL_ID_KEYS = ('cauldronId', 'cauldron_id', 'id')
+_LEVEL_VALUE_KEYS = ('currentVolume', 'current_volume', 'volume', 'level', 'value', 'current')
+
+def _first_present_key(item, keys):
+    """Return the first of keys present in item, else None"""
+    return next((k for k in keys if k in item), None)
+
+def _build_levels():
+    """Fetch live /api/Data and merge it with the static cauldron registry.
+
+    Returns (rows, None) on success or (None, error_message) when the live
+    data could not be fetched or understood.
     """
     
     # 1. Call the REAL EOG API for LIVE data
     try:
         # This endpoint is from your screenshot!
         live_data_url = EOG_API_BASE_URL + "/api/Data" 
-        live_levels_data = safe_get(live_data_url)
+        live_levels_data = safe_get(live_data_url, cache_ttl=LIVE_DATA_CACHE_TTL)
         if live_levels_data is None:
             print(f"ERROR fetching from /api/Data: timeout or API error")
-            return jsonify({"error": "Could not fetch /api/Data (timeout or API error)"}), 500
+            return None, "Could not fetch /api/Data (timeout or API error)"
         
     except Exception as e:
         print(f"ERROR fetching from /api/Data: {e}")
-        return jsonify({"error": str(e)}), 500
+        return None, str(e)
 
     # 2. MERGE live data with our static data
     merged_cauldron_data = []
@@ -1780,10 +2529,10 @@ def get_cauldron_levels():
     live_levels_list = live_levels_data
     if isinstance(live_levels_data, dict):
         # common wrappers
-        for wrapper in ('data', 'items', 'results', 'value'):
-            if wrapper in live_levels_data and isinstance(live_levels_data[wrapper], list):
-                live_levels_list = live_levels_data[wrapper]
-                break
+        wrapper = next((w for w in _LEVEL_WRAPPER_KEYS
+                        if w in live_levels_data and isinstance(live_levels_data[w], list)), None)
+        if wrapper is not None:
+            live_levels_list = live_levels_data[wrapper]
         else:
             # single-object response
             if any(k in live_levels_data for k in ('cauldronId', 'id', 'cauldron_id', 'currentVolume', 'current_volume')):
@@ -1794,7 +2543,7 @@ def get_cauldron_levels():
                     app.logger.debug("Payload: %s", live_levels_data)
                 except Exception:
                     pass
-                return jsonify({"error": "Unexpected /api/Data format"}), 500
+                return None, "Unexpected /api/Data format"
 
     live_levels_map = {}
     if isinstance(live_levels_list, list) and live_levels_list:
@@ -1822,10 +2571,9 @@ def get_cauldron_levels():
                     continue
 
                 cauldron_key = None
-                for k in ('cauldronId', 'cauldron_id', 'id'):
-                    if k in item:
-                        cauldron_key = item[k]
-                        break
+                id_key = _first_present_key(item, _LEVEL_ID_KEYS)
+                if id_key is not None:
+                    cauldron_key = item[id_key]
 
                 if cauldron_key is None and isinstance(item.get('cauldron'), dict):
                     cauldron_key = item['cauldron'].get('id')
@@ -1834,10 +2582,9 @@ def get_cauldron_levels():
                     continue
 
                 level = None
-                for lvl_key in ('currentVolume', 'current_volume', 'volume', 'level', 'value', 'current'):
-                    if lvl_key in item:
-                        level = item[lvl_key]
-                        break
+                lvl_key = _first_present_key(item, _LEVEL_VALUE_KEYS)
+                if lvl_key is not None:
+                    level = item[lvl_key]
 
                 try:
                     if level is not None:
@@ -1855,24 +2602,52 @@ def get_cauldron_levels():
                 except Exception:
                     live_levels_map[k] = v
 
+    # Walk the static registry (keeps dashboard order and cauldrons without a
+    # live reading) and build each row as the static record plus a two-field
+    # overlay in a single allocation
     for static_cauldron in factory_static_data['cauldrons']:
-        cauldron_id = static_cauldron['id']
-        merged_data = static_cauldron.copy()
-        
-        live_level = live_levels_map.get(cauldron_id)
-        
-        merged_data['current_level'] = live_level if live_level is not None else 0
+        live_level = live_levels_map.get(static_cauldron['id'])
+        merged_cauldron_data.append({
+            **static_cauldron,
+            'current_level': live_level if live_level is not None else 0,
+            # Overflow check; discrepancies are flagged later
+            'anomaly': bool(live_level and live_level >= static_cauldron['max_volume']),
+        })
         
-        # Check for overflow
-        if live_level and live_level >= merged_data['max_volume']:
-            merged_data['anomaly'] = True
-        else:
-            merged_data['anomaly'] = False # Will be set by discrepancy check later
+    # 3. Return the fully merged data
+    return merged_cauldron_data, None
+
 
-        merged_cauldron_data.append(merged_data)
+def _build_forecasts(levels):
+    """Forecast minutes to full for each merged level row that is filling"""
+    forecasts = []
+    for cauldron in levels:
+        fill_rate = cauldron.get('fill_rate_per_min', 0)
         
-    # 3. Return the fully merged data to our frontend
-    return jsonify(merged_cauldron_data)
+        if cauldron['current_level'] < cauldron['max_volume']:
+            liters_to_full = cauldron['max_volume'] - cauldron['current_level']
+            
+            if fill_rate > 0:
+                time_to_full_min = liters_to_full / fill_rate
+                forecasts.append({
+                    "cauldron_id": cauldron['id'],
+                    "name": cauldron['name'],
+                    "time_to_full_min": round(time_to_full_min, 1)
+                })
+    return forecasts
+
+
+@app.route('/api/cauldron/levels')
+@requires_auth
+def get_cauldron_levels():
+    """
+    Tool: Gets the current level of all cauldrons.
+    This is called by the dashboard every 5 seconds.
+    """
+    levels, error = _build_levels()
+    if error:
+        return jsonify({"error": error}), 500
+    return ojsonify(levels)
 
 
 # *** BUG FIX: Allow live_levels_data to be passed in ***
@@ -1884,72 +2659,47 @@ def forecast_fill_times(live_levels_data=None):
     Can accept live_levels_data to prevent a second API call.
     """
     
-    forecasts = []
-    
     # 1. Get live levels IF NOT provided
+    as_response = live_levels_data is None
     if live_levels_data is None:
         try:
-            live_levels_response = get_cauldron_levels()
-            if live_levels_response.status_code != 200:
+            live_levels_data, error = _build_levels()
+            if error:
                 return jsonify({"error": "Could not get live levels for forecast."})
-            live_levels_data = live_levels_response.get_json() 
         except Exception as e:
             return jsonify({"error": str(e)})
 
-    # 2. Loop through the live data and use static data to forecast
-    for cauldron in live_levels_data:
-        fill_rate = cauldron.get('fill_rate_per_min', 0)
-        
-        if cauldron['current_level'] < cauldron['max_volume']:
-            liters_to_full = cauldron['max_volume'] - cauldron['current_level']
-            
-            if fill_rate > 0:
-                time_to_full_min = liters_to_full / fill_rate
-                forecasts.append({
-                    "cauldron_id": cauldron['id'],
-                    "name": cauldron['name'],
-                    "time_to_full_min": round(time_to_full_min, 1)
-                })
-    
-    # This function is called by another python function,
-    # so return the raw list, not a Flask Response
-    if live_levels_data is not None:
-        return forecasts
-    
-    return jsonify(forecasts)
+    # 2. Use the live data and static rates to forecast. Python callers that
+    # pass their own levels get the raw list, not a Flask Response
+    forecasts = _build_forecasts(live_levels_data)
+    return ojsonify(forecasts) if as_response else forecasts
 
 
-@app.route('/api/cauldron/status')
-@requires_auth
-def cauldron_status():
-    """
-    Returns merged cauldron data including current level, percentage full,
-    and estimated time to full (minutes) by calling existing tools.
-    Frontend dashboard will poll this endpoint.
+def _build_status(live_levels, forecasts):
+    """Status rows: level rows with active drains applied, percent full,
+    time to full and discrepancy/drain flags. Updates ``live_levels`` rows
+    in place and returns them as a new list.
     """
+    global active_drains
     # Calculate request timestamp ONCE for this entire request
     # This prevents time-to-full from jumping around on every poll
-    request_timestamp = datetime.utcnow().replace(tzinfo=timezone.utc)
-    
-    try:
-        live_levels_response = get_cauldron_levels()
-        if live_levels_response.status_code != 200:
-            return live_levels_response
-        live_levels = live_levels_response.get_json()
-    except Exception as e:
-        return jsonify({"error": f"Could not fetch live levels: {e}"}), 500
-
-    try:
-        # *** BUG FIX: Pass the live_levels data to stop the race condition ***
-        forecasts = forecast_fill_times(live_levels_data=live_levels)
-        
-    except Exception as e:
-        print(f"Error in forecast_fill_times: {e}")
-        forecasts = []
+    request_timestamp = datetime.now(timezone.utc)
 
     # Build a lookup of forecast by cauldron_id
     forecast_map = {f.get('cauldron_id'): f for f in (forecasts or [])}
 
+    # Take the drains snapshot once and work out every drain's level without
+    # the lock; it is only taken to drop the drains that finished
+    drain_snap = active_drains
+    drain_now = datetime.now()  # one clock read for every drain in this response
+    drain_levels = {}
+    for cid, drain_info in drain_snap.items():
+        elapsed = (drain_now - drain_info['start_time']).total_seconds() / 60  # minutes
+        drained_amount = elapsed * drain_info['drain_rate']
+        # Calculate current level after draining
+        drain_levels[cid] = (elapsed, drained_amount, max(0, drain_info['initial_level'] - drained_amount))
+    finished_drains = []
+
     status_list = []
     for c in live_levels:
         max_vol = c.get('max_volume') or 1
@@ -1960,34 +2710,28 @@ def cauldron_status():
         is_draining = False
         drain_progress = 0
         
-        global active_drains, drains_lock
-        
-        with drains_lock:
-            if cauldron_id in active_drains:
-                drain_info = active_drains[cauldron_id]
-                elapsed = (datetime.now() - drain_info['start_time']).total_seconds() / 60  # minutes
-                drained_amount = elapsed * drain_info['drain_rate']
-                
-                # Calculate current level after draining
-                new_level = max(0, drain_info['initial_level'] - drained_amount)
+        if cauldron_id in drain_levels and cauldron_id not in finished_drains:
+            drain_info = drain_snap[cauldron_id]
+            elapsed, drained_amount, new_level = drain_levels[cauldron_id]
+            
+            if new_level <= 0:
+                # Drain complete, remove from active drains below
+                print(f"[DRAIN] ✓ Complete for {drain_info['cauldron_name']} - drained {drained_amount:.1f}L in {elapsed:.1f} min")
+                finished_drains.append(cauldron_id)
+                current = 0
+            else:
+                # Still draining
+                current = new_level
+                is_draining = True
+                drain_progress = (drained_amount / drain_info['initial_level']) * 100 if drain_info['initial_level'] > 0 else 100
                 
-                if new_level <= 0:
-                    # Drain complete, remove from active drains
-                    print(f"[DRAIN] ✓ Complete for {drain_info['cauldron_name']} - drained {drained_amount:.1f}L in {elapsed:.1f} min")
-                    del active_drains[cauldron_id]
-                    current = 0
-                else:
-                    # Still draining
-                    current = new_level
-                    is_draining = True
-                    drain_progress = (drained_amount / drain_info['initial_level']) * 100 if drain_info['initial_level'] > 0 else 100
-                    
-                    # Log every 10% milestone
-                    if int(drain_progress) % 10 == 0 and int(drain_progress) > 0:
-                        milestone = int(drain_progress // 10) * 10
-                        if not hasattr(drain_info, f'logged_{milestone}'):
-                            print(f"[DRAIN] {drain_info['cauldron_name']}: {drain_progress:.1f}% complete ({current:.1f}L remaining)")
-                            setattr(drain_info, f'logged_{milestone}', True)
+                # Log each 10% milestone once
+                bucket = int(drain_progress) // 10
+                bit = 1 << bucket
+                logged_mask = drain_info.get('logged_mask', 0)
+                if bucket > 0 and not (logged_mask & bit):
+                    print(f"[DRAIN] {drain_info['cauldron_name']}: {drain_progress:.1f}% complete ({current:.1f}L remaining)")
+                    drain_info['logged_mask'] = logged_mask | bit
         
         try:
             percent = round((current / float(max_vol)) * 100, 1)
@@ -2004,7 +2748,7 @@ def cauldron_status():
             except Exception:
                 time_to_full_seconds = None
 
-        status = c.copy()
+        status = c  # callers pass rows built for this request, so update in place
         status['current_level'] = current  # Override with drained level
         status['percent_full'] = percent
         status['time_to_full_min'] = time_to_full_min
@@ -2031,7 +2775,74 @@ def cauldron_status():
             status['full_at'] = None
         status_list.append(status)
 
-    return jsonify(status_list)
+    if finished_drains:
+        with drains_lock:
+            # Leave a drain that was restarted since the snapshot alone
+            done = {cid for cid in finished_drains if active_drains.get(cid) is drain_snap[cid]}
+            if done:
+                active_drains = {cid: d for cid, d in active_drains.items() if cid not in done}
+
+    return status_list
+
+
+def _levels_and_forecasts():
+    """Shared first step of the status builders: (levels, forecasts, error)"""
+    try:
+        live_levels, error = _build_levels()
+        if error:
+            return None, None, error
+    except Exception as e:
+        return None, None, f"Could not fetch live levels: {e}"
+
+    try:
+        # *** BUG FIX: Pass the live_levels data to stop the race condition ***
+        forecasts = _build_forecasts(live_levels)
+        
+    except Exception as e:
+        print(f"Error in forecast_fill_times: {e}")
+        forecasts = []
+    return live_levels, forecasts, None
+
+
+def _status_rows():
+    """Cauldron status rows for in-process callers, without a JSON round trip.
+    Returns (rows, None) or (None, error_message).
+    """
+    live_levels, forecasts, error = _levels_and_forecasts()
+    if error:
+        return None, error
+    return _build_status(live_levels, forecasts), None
+
+
+@app.route('/api/cauldron/status')
+@requires_auth
+def cauldron_status():
+    """
+    Returns merged cauldron data including current level, percentage full,
+    and estimated time to full (minutes) by calling existing tools.
+    Frontend dashboard will poll this endpoint.
+    """
+    status_list, error = _status_rows()
+    if error:
+        return jsonify({"error": error}), 500
+    if _wants_ndjson():
+        return ndjson_response(status_list)
+    return ojsonify(status_list)
+
+
+@app.route('/api/cauldron/bulk')
+@requires_auth
+def cauldron_bulk():
+    """
+    Levels, forecasts and status from one /api/Data fetch, so the dashboard
+    can replace its three polls with a single request.
+    """
+    live_levels, forecasts, error = _levels_and_forecasts()
+    if error:
+        return jsonify({"error": error}), 500
+    # Status rows are derived in place, so give them their own copies
+    status = _build_status([dict(c) for c in live_levels], forecasts)
+    return ojsonify({'levels': live_levels, 'forecasts': forecasts, 'status': status})
 
 
 @app.route('/api/couriers/dispatch-bulk', methods=['POST'])
@@ -2043,12 +2854,10 @@ def dispatch_couriers_bulk():
     
     try:
         # Get current cauldron status
-        status_response = cauldron_status()
-        if status_response.status_code != 200:
+        cauldrons, error = _status_rows()
+        if error:
             return jsonify({'error': 'Could not fetch cauldron status'}), 500
         
-        cauldrons = status_response.get_json()
-        
         # Find cauldrons above threshold
         dispatched = []
         failed = []
@@ -2056,34 +2865,47 @@ def dispatch_couriers_bulk():
         
         agent = AgentWorkflow()
         
+        to_dispatch = []
         for c in cauldrons:
-            cauldron_id = c.get('id')
             percent = c.get('percent_full', 0)
-            is_draining = c.get('is_draining', False)
-            
             if percent >= threshold_percent:
-                if is_draining:
+                if c.get('is_draining', False):
                     already_draining.append({
-                        'id': cauldron_id,
+                        'id': c.get('id'),
                         'name': c.get('name'),
                         'percent': percent
                     })
                 else:
-                    # Dispatch courier
-                    result = agent._dispatch_courier(cauldron_id)
-                    if result.get('status') == 'success':
-                        dispatched.append({
-                            'id': cauldron_id,
-                            'name': c.get('name'),
-                            'percent': percent,
-                            'current_level': c.get('current_level')
-                        })
-                    else:
-                        failed.append({
-                            'id': cauldron_id,
-                            'name': c.get('name'),
-                            'error': result.get('error', 'Unknown error')
-                        })
+                    to_dispatch.append(c)
+        
+        # Dispatches are independent and wait on ticket resolution I/O,
+        # so run them concurrently; results keep status order.
+        def dispatch_one(c):
+            return agent._dispatch_courier(c.get('id'), live_cauldron=c)
+        
+        if len(to_dispatch) > 1:
+            # one context wrapper per task: a copied request context can
+            # only be pushed by one thread at a time
+            ex = agent._get_executor()
+            futures = [ex.submit(_in_flask_context(dispatch_one), c) for c in to_dispatch]
+            results = [f.result() for f in futures]
+        else:
+            results = [dispatch_one(c) for c in to_dispatch]
+        
+        for c, result in zip(to_dispatch, results):
+            if result.get('status') == 'success':
+                dispatched.append({
+                    'id': c.get('id'),
+                    'name': c.get('name'),
+                    'percent': c.get('percent_full', 0),
+                    'current_level': c.get('current_level')
+                })
+            else:
+                failed.append({
+                    'id': c.get('id'),
+                    'name': c.get('name'),
+                    'error': result.get('error', 'Unknown error')
+                })
         
         return jsonify({
             'threshold_percent': threshold_percent,
@@ -2101,28 +2923,26 @@ def dispatch_couriers_bulk():
 @requires_auth
 def debug_drains():
     """Debug endpoint to check active drain status"""
-    global active_drains, drains_lock
-    
-    with drains_lock:
-        debug_info = {}
-        for cid, drain in active_drains.items():
-            elapsed = (datetime.now() - drain['start_time']).total_seconds() / 60
-            drained = elapsed * drain['drain_rate']
-            remaining = max(0, drain['initial_level'] - drained)
-            progress = (drained / drain['initial_level'] * 100) if drain['initial_level'] > 0 else 100
-            
-            debug_info[cid] = {
-                'name': drain['cauldron_name'],
-                'initial_level': drain['initial_level'],
-                'current_level': remaining,
-                'drain_rate': drain['drain_rate'],
-                'elapsed_minutes': round(elapsed, 2),
-                'progress_percent': round(progress, 2),
-                'started_at': drain['start_time'].isoformat()
-            }
+    drains = active_drains  # lock-free snapshot
+    debug_info = {}
+    for cid, drain in drains.items():
+        elapsed = (datetime.now() - drain['start_time']).total_seconds() / 60
+        drained = elapsed * drain['drain_rate']
+        remaining = max(0, drain['initial_level'] - drained)
+        progress = (drained / drain['initial_level'] * 100) if drain['initial_level'] > 0 else 100
+        
+        debug_info[cid] = {
+            'name': drain['cauldron_name'],
+            'initial_level': drain['initial_level'],
+            'current_level': remaining,
+            'drain_rate': drain['drain_rate'],
+            'elapsed_minutes': round(elapsed, 2),
+            'progress_percent': round(progress, 2),
+            'started_at': drain['start_time'].isoformat()
+        }
     
     return jsonify({
-        'active_drains': len(active_drains),
+        'active_drains': len(drains),
         'drains': debug_info
     })
 
@@ -2140,16 +2960,15 @@ def data_historic():
         end_q = request.args.get('end')
         cauldron_id = request.args.get('cauldron_id')
 
-        print(f"[HISTORIC] Fetching data for date range: {start_q} to {end_q}")
+        if app.debug:
+            print(f"[HISTORIC] Fetching data for date range: {start_q} to {end_q}")
 
-        raw = safe_get(EOG_API_BASE_URL + '/api/Data')
-        if raw is None:
+        data_list, sorted_times, record_indices = _get_data_time_index()
+        if data_list is None:
             print("[HISTORIC] Failed to fetch /api/Data")
             return jsonify({'error': 'Could not fetch /api/Data (timeout or API error)'}), 500
-
-        # API returns array directly according to documentation
-        data_list = raw if isinstance(raw, list) else []
-        print(f"[HISTORIC] Received {len(data_list)} records from API")
+        if app.debug:
+            print(f"[HISTORIC] Received {len(data_list)} records from API")
 
         # Parse filter times
         start_dt = None
@@ -2161,10 +2980,10 @@ def data_historic():
                 start_dt = _parse_timestamp(dt_str)
                 if start_dt and start_dt.tzinfo is None:
                     start_dt = start_dt.replace(tzinfo=timezone.utc)
-                print(f"[HISTORIC] Parsed start time: {start_dt}")
+                if app.debug:
+                    print(f"[HISTORIC] Parsed start time: {start_dt}")
             except Exception as e:
                 print(f"[HISTORIC] Error parsing start time: {e}")
-                import traceback
                 traceback.print_exc()
                 start_dt = None
         if end_q:
@@ -2174,103 +2993,92 @@ def data_historic():
                 end_dt = _parse_timestamp(dt_str)
                 if end_dt and end_dt.tzinfo is None:
                     end_dt = end_dt.replace(tzinfo=timezone.utc)
-                print(f"[HISTORIC] Parsed end time: {end_dt}")
+                if app.debug:
+                    print(f"[HISTORIC] Parsed end time: {end_dt}")
             except Exception as e:
                 print(f"[HISTORIC] Error parsing end time: {e}")
-                import traceback
                 traceback.print_exc()
                 end_dt = None
 
-        out = []
-        for rec in data_list:
-            try:
-                ts = None
-                if isinstance(rec, dict):
-                    ts = _parse_timestamp(rec.get('timestamp') or rec.get('time') or rec.get('t'))
-                    # Make timezone-aware if needed
-                    if ts and ts.tzinfo is None:
-                        ts = ts.replace(tzinfo=timezone.utc)
-                if ts is None:
-                    continue
-                if start_dt and ts < start_dt:
-                    continue
-                if end_dt and ts > end_dt:
+        # Binary-search the cached time index for the requested range, then
+        # visit the matching records in their original order
+        lo = bisect.bisect_left(sorted_times, start_dt) if start_dt else 0
+        hi = bisect.bisect_right(sorted_times, end_dt) if end_dt else len(sorted_times)
+        in_range = sorted(zip(record_indices[lo:hi], sorted_times[lo:hi]))
+
+        def filtered_records():
+            for idx, ts in in_range:
+                try:
+                    rec = data_list[idx]
+                    if cauldron_id:
+                        # filter to a single cauldron's numeric value
+                        levels = rec.get('cauldron_levels') or rec.get('levels') or {}
+                        value = None
+                        if isinstance(levels, dict):
+                            value = levels.get(cauldron_id)
+                        yield {'timestamp': ts.isoformat(), 'cauldron_id': cauldron_id, 'value': value}
+                    else:
+                        yield rec
+                except Exception as e:
+                    print(f"[HISTORIC] Error processing record: {e}")
                     continue
 
-                if cauldron_id:
-                    # filter to a single cauldron's numeric value
-                    levels = rec.get('cauldron_levels') or rec.get('levels') or {}
-                    value = None
-                    if isinstance(levels, dict):
-                        value = levels.get(cauldron_id)
-                    out.append({'timestamp': ts.isoformat(), 'cauldron_id': cauldron_id, 'value': value})
-                else:
-                    out.append(rec)
-            except Exception as e:
-                print(f"[HISTORIC] Error processing record: {e}")
-                continue
+        if _wants_ndjson():
+            if app.debug:
+                print(f"[HISTORIC] Streaming up to {len(in_range)} filtered records")
+            return ndjson_response(filtered_records())
 
-        print(f"[HISTORIC] Returning {len(out)} filtered records")
-        return jsonify(out)
+        out = list(filtered_records())
+        if app.debug:
+            print(f"[HISTORIC] Returning {len(out)} filtered records")
+        return ojsonify(out)
         
     except Exception as e:
         print(f"[HISTORIC] Error in data_historic endpoint: {str(e)}")
-        import traceback
         traceback.print_exc()
         return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
 
+# (payload, {str(ticket_id): ticket}) for the last /api/Tickets payload seen
+# by the debug route; safe_get hands back the same object while it is cached
+_tickets_index = (None, {})
+
+def _tickets_by_id(tickets_raw):
+    """Index a /api/Tickets payload by ticket id (first occurrence wins)"""
+    global _tickets_index
+    payload, index = _tickets_index
+    if payload is tickets_raw:
+        return index
+    tickets_list = tickets_raw if isinstance(tickets_raw, list) else (tickets_raw.get('data') if isinstance(tickets_raw, dict) else [])
+    index = {}
+    for t in tickets_list or []:
+        if isinstance(t, dict):
+            index.setdefault(str(t.get('id') or t.get('ticket_id') or t.get('ticketId')), t)
+    _tickets_index = (tickets_raw, index)
+    return index
+
 @app.route('/api/debug/ticket-matching/<ticket_id>')
 @requires_auth
 def debug_ticket_matching(ticket_id):
     """Debug endpoint to inspect ticket matching details for a specific ticket."""
     try:
-        # Fetch tickets
-        tickets_raw = safe_get(EOG_API_BASE_URL + '/api/Tickets', timeout=5)
+        # Fetch tickets, with /api/Data loading alongside unless it is cached
+        data_future = None if _data_cache_fresh() else _data_prefetch_pool.submit(_get_data_and_series)
+        tickets_raw = safe_get(EOG_API_BASE_URL + '/api/Tickets', timeout=5, cache_ttl=1.0)
         if tickets_raw is None:
             return jsonify({'error': 'Could not fetch tickets'}), 500
         
-        tickets_list = tickets_raw if isinstance(tickets_raw, list) else (tickets_raw.get('data') if isinstance(tickets_raw, dict) else [])
-        
         # Find the ticket
-        ticket = None
-        for t in tickets_list:
-            tid = t.get('id') or t.get('ticket_id') or t.get('ticketId')
-            if str(tid) == str(ticket_id):
-                ticket = t
-                break
+        ticket = _tickets_by_id(tickets_raw).get(str(ticket_id))
         
         if not ticket:
             return jsonify({'error': f'Ticket {ticket_id} not found'}), 404
         
-        # Fetch data
-        data_raw = safe_get(EOG_API_BASE_URL + '/api/Data', timeout=10)
-        if data_raw is None:
+        # Data and per-cauldron series (cached for a few seconds)
+        data_list, series_map = data_future.result() if data_future else _get_data_and_series()
+        if data_list is None:
             return jsonify({'error': 'Could not fetch historical data'}), 500
         
-        # API returns array directly according to documentation
-        data_list = data_raw if isinstance(data_raw, list) else []
-        
-        # Build series
-        series_map = {}
-        for rec in data_list:
-            ts = _parse_timestamp(rec.get('timestamp') or rec.get('time') or rec.get('t'))
-            if ts is None:
-                continue
-            levels = rec.get('cauldron_levels') or rec.get('levels') or {}
-            if not isinstance(levels, dict):
-                continue
-            for cid, val in levels.items():
-                try:
-                    v = float(val)
-                except Exception:
-                    continue
-                series_map.setdefault(cid, []).append((ts, v))
-        
-        # Sort series
-        for cid in series_map:
-            series_map[cid].sort(key=lambda x: x[0])
-        
         # Get ticket info
         cauldron_id = ticket.get('cauldronId') or ticket.get('cauldron_id') or ticket.get('cauldron')
         date_str = ticket.get('date') or ticket.get('day') or ticket.get('ticket_date')
@@ -2280,72 +3088,54 @@ def debug_ticket_matching(ticket_id):
         match_day = None
         if date_str:
             try:
-                if len(date_str) <= 10:
-                    match_day = datetime.fromisoformat(date_str).date().isoformat()
-                else:
-                    dt = _parse_timestamp(date_str)
-                    if dt:
-                        match_day = dt.date().isoformat()
+                match_day = _ticket_day(date_str)
             except Exception:
                 pass
         
         # Find drain events
         if not cauldron_id or cauldron_id not in series_map:
-            return jsonify({
+            return ojsonify({
                 'ticket': ticket,
                 'error': 'Cauldron not found in historical data',
                 'cauldron_id': cauldron_id
             })
         
         series = series_map[cauldron_id]
-        static = next((c for c in factory_static_data['cauldrons'] if c['id'] == cauldron_id), None)
+        static = _CAULDRONS_BY_ID.get(cauldron_id)
         fill_rate = static.get('fill_rate_per_min', 0) if static else 0
         
-        # Find all drains for this cauldron
+        # Find all drains for this cauldron: each maximal decreasing run
         all_drains = []
-        i = 0
-        n = len(series)
-        while i < n-1:
-            t0, v0 = series[i]
-            j = i+1
-            if series[j][1] < v0:
-                start_t = t0
-                start_v = v0
-                end_t = series[j][0]
-                end_v = series[j][1]
-                j += 1
-                while j < n and series[j][1] < series[j-1][1]:
-                    end_t = series[j][0]
-                    end_v = series[j][1]
-                    j += 1
-                
-                duration_min = (end_t - start_t).total_seconds() / 60.0
-                drained = max(0.0, start_v - end_v)
-                drained_adjusted = drained + (fill_rate * duration_min)
-                
-                all_drains.append({
-                    'start': start_t.isoformat(),
-                    'end': end_t.isoformat(),
-                    'day': start_t.date().isoformat(),
-                    'start_v': round(start_v, 2),
-                    'end_v': round(end_v, 2),
-                    'duration_min': round(duration_min, 1),
-                    'drained': round(drained_adjusted, 2),
-                    'fill_rate': fill_rate
-                })
-                i = j
-            else:
-                i += 1
+        drain_days = []  # date ordinal of each drain's start, ascending like the series
+        times = series['t']
+        values = series['v']
+        for s, e in _decreasing_runs(values):
+            start_t, start_v = times[s], float(values[s])
+            end_t, end_v = times[e], float(values[e])
+            duration_min = (end_t - start_t).total_seconds() / 60.0
+            drained = max(0.0, start_v - end_v)
+            drained_adjusted = drained + (fill_rate * duration_min)
+            
+            all_drains.append({
+                'start': start_t.isoformat(),
+                'end': end_t.isoformat(),
+                'day': start_t.date().isoformat(),
+                'start_v': round(start_v, 2),
+                'end_v': round(end_v, 2),
+                'duration_min': round(duration_min, 1),
+                'drained': round(drained_adjusted, 2),
+                'fill_rate': fill_rate
+            })
+            drain_days.append(start_t.toordinal())
         
         # Find matching drains (±1 day)
         matching_drains = []
         if match_day:
             try:
-                match_date = datetime.fromisoformat(match_day).date()
-                for drain in all_drains:
-                    drain_date = datetime.fromisoformat(drain['day']).date()
-                    if abs((drain_date - match_date).days) <= 1:
-                        matching_drains.append(drain)
+                match_ord = _day_ordinal(match_day)
+                lo = bisect.bisect_left(drain_days, match_ord - 1)
+                hi = bisect.bisect_right(drain_days, match_ord + 1)
+                matching_drains = all_drains[lo:hi]
             except Exception:
                 pass
         
@@ -2354,7 +3144,7 @@ def debug_ticket_matching(ticket_id):
         if amount is not None and total_calculated is not None:
             diff = round(amount - total_calculated, 2)
         
-        return jsonify({
+        return ojsonify({
             'ticket': {
                 'id': ticket_id,
                 'cauldron_id': cauldron_id,
@@ -2373,7 +3163,6 @@ def debug_ticket_matching(ticket_id):
         })
         
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
@@ -2386,15 +3175,36 @@ def get_network():
 
 
 
+# Tickets repeat the same few date strings, so the parsed day is memoized
+@lru_cache(maxsize=4096)
+def _ticket_day(date_str):
+    """ISO day (YYYY-MM-DD) a ticket's date or timestamp string falls on, or None"""
+    try:
+        # if only date like YYYY-MM-DD
+        if len(date_str) <= 10:
+            return datetime.fromisoformat(date_str).date().isoformat()
+        dt = _parse_timestamp(date_str)
+        return dt.date().isoformat() if dt else None
+    except Exception:
+        return None
+
+@lru_cache(maxsize=4096)
+def _day_ordinal(day):
+    """Date ordinal of an ISO day string, comparable with series/drain day ordinals"""
+    return datetime.fromisoformat(day).toordinal()
+
+# Ticket fields that may carry the collected amount, in priority order
+_AMOUNT_KEYS = ('amount', 'amount_collected', 'quantity', 'volume')
+
 def _extract_ticket_amount(ticket):
-    for k in ('amount', 'amount_collected', 'quantity', 'volume'):
+    for k in _AMOUNT_KEYS:
         v = ticket.get(k)
         if v is not None:
             try:
                 return float(v)
             except Exception:
                 pass
-    # fallback: look for nested fields
+    # fallback: look for nested fields (only reached when no known key is set)
     for v in ticket.values():
         if isinstance(v, (int, float)):
             return float(v)
@@ -2409,7 +3219,10 @@ def tickets_match():
     Returns a list of ticket match results and any unmatched drain events.
     This recomputes on each request so it is resilient to changing ticket input.
     """
-    tickets_raw = safe_get(EOG_API_BASE_URL + '/api/Tickets')
+    # Fetch /api/Data alongside the tickets unless the cache already has it
+    data_future = None if _data_cache_fresh() else _data_prefetch_pool.submit(_get_data_and_series)
+
+    tickets_raw = safe_get(EOG_API_BASE_URL + '/api/Tickets', cache_ttl=1.0)
     if tickets_raw is None:
         return jsonify({'error': 'Could not fetch /api/Tickets (timeout or API error)'}), 500
 
@@ -2421,136 +3234,32 @@ def tickets_match():
     global resolved_tickets, resolved_tickets_lock
     
     seen_tickets = {}
-    with resolved_tickets_lock:
-        for t in tickets_list:
-            ticket_id = t.get('id') or t.get('ticket_id') or t.get('ticketId')
-            # Check if ticket is resolved/completed
-            status = (t.get('status') or t.get('state') or t.get('resolved') or '').lower()
-            is_resolved_api = status in ['resolved', 'completed', 'done', 'closed', 'finished'] or t.get('resolved') == True
-            is_resolved_local = ticket_id in resolved_tickets
-            
-            # Only include unresolved tickets (not resolved via API or locally)
-            if ticket_id and ticket_id not in seen_tickets and not is_resolved_api and not is_resolved_local:
-                seen_tickets[ticket_id] = t
+    for t in tickets_list:
+        ticket_id = t.get('id') or t.get('ticket_id') or t.get('ticketId')
+        # Check if ticket is resolved/completed
+        status = (t.get('status') or t.get('state') or t.get('resolved') or '').lower()
+        is_resolved_api = status in ['resolved', 'completed', 'done', 'closed', 'finished'] or t.get('resolved') == True
+        is_resolved_local = ticket_id in resolved_tickets  # atomic read, no lock needed
+        
+        # Only include unresolved tickets (not resolved via API or locally)
+        if ticket_id and ticket_id not in seen_tickets and not is_resolved_api and not is_resolved_local:
+            seen_tickets[ticket_id] = t
     
     tickets_list = list(seen_tickets.values())
 
-    # Fetch full historical data once
-    data_raw = safe_get(EOG_API_BASE_URL + '/api/Data')
-    if data_raw is None:
+    # Full historical data and per-cauldron time series (cached for a few seconds)
+    data_list, series_map = data_future.result() if data_future else _get_data_and_series()
+    if data_list is None:
         return jsonify({'error': 'Could not fetch /api/Data (timeout or API error)'}), 500
 
-    # API returns array directly according to documentation
-    data_list = data_raw if isinstance(data_raw, list) else []
-
-    # Build per-cauldron time series map
-    series_map = {}
-    for rec in data_list:
-        ts = _parse_timestamp(rec.get('timestamp') or rec.get('time') or rec.get('t'))
-        if ts is None:
-            continue
-        levels = rec.get('cauldron_levels') or rec.get('levels') or {}
-        if not isinstance(levels, dict):
-            continue
-        for cid, val in levels.items():
-            try:
-                v = float(val)
-            except Exception:
-                continue
-            series_map.setdefault(cid, []).append((ts, v))
-
-    # sort series
-    for cid in series_map:
-        series_map[cid].sort(key=lambda x: x[0])
-
     results = []
     unmatched_drains = []
+    suspicious_cids = set()
+    # cauldrons with a ticket that could be checked against a drain amount
+    ticketed_cauldrons = set()
 
-    # Helper: find static cauldron data
-    def get_static(cauldron_id):
-        return next((c for c in factory_static_data['cauldrons'] if c['id'] == cauldron_id), None)
-
-    # Precompute all drain events per cauldron by day
-    drains_by_cauldron_day = {}
-    for cid, series in series_map.items():
-        static = get_static(cid)
-        fill_rate = static.get('fill_rate_per_min', 0) if static else 0
-        
-        # More robust drain detection: look for net decrease over time windows
-        # This handles cases where fill_rate causes small increases during draining
-        i = 0
-        n = len(series)
-        while i < n-1:
-            t0, v0 = series[i]
-            j = i+1
-            
-            # Start of potential drain: level decreased
-            if series[j][1] < v0:
-                start_t = t0
-                start_v = v0
-                end_t = series[j][0]
-                end_v = series[j][1]
-                j += 1
-                
-                # Continue drain event even if there are small increases (fill_rate)
-                # But stop when level stops decreasing (stabilizes or increases significantly)
-                # Also limit drain duration AND amount to prevent merging multiple courier visits
-                MAX_DRAIN_DURATION_MIN = 10  # Split drains longer than 10 minutes (was 15)
-                MAX_DRAIN_AMOUNT_L = 110  # Split if drained more than 110L (was 120L, typical ticket is ~95L)
-                consecutive_increases = 0
-                consecutive_stable = 0
-                while j < n:
-                    prev_v = series[j-1][1]
-                    curr_v = series[j][1]
-                    curr_t = series[j][0]
-                    
-                    # Check if drain has been going on too long OR drained too much
-                    duration_so_far = (curr_t - start_t).total_seconds() / 60.0
-                    drained_so_far = start_v - curr_v
-                    if duration_so_far > MAX_DRAIN_DURATION_MIN or drained_so_far > MAX_DRAIN_AMOUNT_L:
-                        # Split here - this is likely a separate drain event
-                        break
-                    
-                    # If actively decreasing, continue
-                    if curr_v < prev_v - 0.5:  # Decreasing by >0.5L
-                        end_t = curr_t
-                        end_v = curr_v
-                        consecutive_increases = 0
-                        consecutive_stable = 0
-                        j += 1
-                    # Allow small increases (fill_rate) but limit them
-                    elif curr_v > prev_v and consecutive_increases < 2:
-                        consecutive_increases += 1
-                        consecutive_stable = 0
-                        j += 1
-                    # Allow stable/near-stable points but limit them
-                    elif abs(curr_v - prev_v) <= 0.5 and consecutive_stable < 3:
-                        consecutive_stable += 1
-                        j += 1
-                    else:
-                        # Drain has ended (stopped decreasing, or too many stable/increasing points)
-                        break
-
-                duration_min = (end_t - start_t).total_seconds() / 60.0
-                drained = max(0.0, start_v - end_v)
-                
-                # Only record as drain if significant (>1L drained) to filter extreme noise
-                if drained > 1:
-                    # account for potion generated during drain
-                    drained_adjusted = drained + (fill_rate * duration_min)
-
-                    day_key = start_t.date().isoformat()
-                    drains_by_cauldron_day.setdefault(cid, {}).setdefault(day_key, []).append({
-                        'start': start_t.isoformat(),
-                        'end': end_t.isoformat(),
-                        'start_v': start_v,
-                        'end_v': end_v,
-                        'duration_min': round(duration_min, 1),
-                        'drained': round(drained_adjusted, 2)
-                    })
-                i = j
-            else:
-                i += 1
+    # Drain events per cauldron by day (cached with the series)
+    drains_by_cauldron_day = _drains_by_cauldron_day(series_map)
 
     # Now match tickets
     for t in tickets_list:
@@ -2565,13 +3274,7 @@ def tickets_match():
         match_day = None
         if date_str:
             try:
-                # if only date like YYYY-MM-DD
-                if len(date_str) <= 10:
-                    match_day = datetime.fromisoformat(date_str).date().isoformat()
-                else:
-                    dt = _parse_timestamp(date_str)
-                    if dt:
-                        match_day = dt.date().isoformat()
+                match_day = _ticket_day(date_str)
             except Exception:
                 match_day = None
 
@@ -2580,8 +3283,8 @@ def tickets_match():
         
         # Match drain events ONLY on the exact ticket date
         # If multiple drains exist on that day, find the one closest to the ticket amount
-        if cauldron_id and match_day and cauldron_id in drains_by_cauldron_day:
-            day_drains = drains_by_cauldron_day.get(cauldron_id, {}).get(match_day, [])
+        if cauldron_id and match_day:
+            day_drains = drains_by_cauldron_day.get((cauldron_id, match_day))
             if day_drains:
                 if amount is not None:
                     # Find the drain closest to the ticket amount
@@ -2596,18 +3299,11 @@ def tickets_match():
         # If we couldn't compute from events, fallback to per-sample diff sum
         if calculated is None and cauldron_id:
             # try naive computation over series_map
-            series = series_map.get(cauldron_id, [])
+            series = series_map.get(cauldron_id)
             # sum all decreases within the exact calendar day only
-            if match_day:
+            if match_day and series is not None:
                 try:
-                    s = 0.0
-                    for i in range(len(series)-1):
-                        a_ts, a_v = series[i]
-                        b_ts, b_v = series[i+1]
-                        # Check if both timestamps are on the exact match_day
-                        if a_ts.date().isoformat() == match_day and b_ts.date().isoformat() == match_day:
-                            if b_v < a_v:
-                                s += (a_v - b_v)
+                    s = _day_drop_total(series, _day_ordinal(match_day))
                     calculated = s if s > 0 else None
                 except Exception:
                     pass
@@ -2642,7 +3338,13 @@ def tickets_match():
             reason = 'Insufficient data to compute match.'
 
         # Log a concise summary to help debugging in judge runs
-        app.logger.info(f"[tickets_match] ticket={ticket_id} cauldron={cauldron_id} day={match_day} ticket_amount={amount} calculated={calculated} diff={diff} suspicious={suspicious}")
+        app.logger.info("[tickets_match] ticket=%s cauldron=%s day=%s ticket_amount=%s calculated=%s diff=%s suspicious=%s",
+                        ticket_id, cauldron_id, match_day, amount, calculated, diff, suspicious)
+
+        if suspicious:
+            suspicious_cids.add(cauldron_id)
+        if amount is not None and ticket_id is not None and calculated is not None:
+            ticketed_cauldrons.add(cauldron_id)
 
         results.append({
             'ticket_id': ticket_id,
@@ -2656,19 +3358,25 @@ def tickets_match():
         })
 
     # find drain events that have no matching ticket (unmatched drains)
-    for cid, days in drains_by_cauldron_day.items():
-        for day, events in days.items():
-            # if there is no ticket for this cauldron/day, mark as unlogged
-            has_ticket = any((r for r in results if r['cauldron_id'] == cid and r['ticket_amount'] is not None and r['ticket_id'] is not None and (r['calculated_amount'] is not None)))
-            if not has_ticket:
-                for e in events:
-                    unmatched_drains.append({'cauldron_id': cid, 'day': day, 'event': e})
-
-    # Update global suspicious_cauldrons set
+    for (cid, day), events in drains_by_cauldron_day.items():
+        if cid not in ticketed_cauldrons:
+            for e in events:
+                unmatched_drains.append({'cauldron_id': cid, 'day': day, 'event': e})
+
+    # Publish the new suspicious set with one rebind; readers never see it
+    # half-built
     global suspicious_cauldrons
-    suspicious_cauldrons = {r['cauldron_id'] for r in results if r.get('suspicious')}
+    suspicious_cauldrons = frozenset(suspicious_cids)
+
+    if _wants_ndjson():
+        def lines():
+            for r in results:
+                yield {'type': 'match', **r}
+            for u in unmatched_drains:
+                yield {'type': 'unmatched_drain', **u}
+        return ndjson_response(lines())
 
-    return jsonify({'matches': results, 'unmatched_drains': unmatched_drains})
+    return ojsonify({'matches': results, 'unmatched_drains': unmatched_drains})
 
 @app.route('/api/logistics/dispatch_courier', methods=['POST'])
 @requires_auth
@@ -2680,7 +3388,7 @@ def dispatch_courier():
     data = request.json
     cauldron_id = data.get('cauldron_id')
     
-    cauldron_data = next((c for c in factory_static_data['cauldrons'] if c['id'] == cauldron_id), None)
+    cauldron_data = _CAULDRONS_BY_ID.get(cauldron_id)
     
     if not cauldron_data:
         return jsonify({"status": "error", "message": "Invalid cauldron ID."}), 400
@@ -2714,10 +3422,7 @@ def handle_agent_chat():
     nemotron_client = None
     if use_nemotron and _HAS_NEMOTRON and nv_api_key:
         try:
-            nemotron_client = OpenAI(
-                base_url="https://integrate.api.nvidia.com/v1",
-                api_key=nv_api_key
-            )
+            nemotron_client = _get_nemotron_client(nv_api_key)
         except Exception as e:
             print(f"[Nemotron] Failed to initialize client: {e}")
     
@@ -2727,7 +3432,7 @@ def handle_agent_chat():
     # Execute multi-step workflow
     result = agent.plan_and_execute(user_message)
     
-    return jsonify({
+    return ojsonify({
         'agent_response': result['response'],
         'agent_plan': result['steps'],
         'intent': result['intent'],
@@ -2748,10 +3453,7 @@ def get_agent_insights():
     nemotron_client = None
     if _HAS_NEMOTRON and nv_api_key:
         try:
-            nemotron_client = OpenAI(
-                base_url="https://integrate.api.nvidia.com/v1",
-                api_key=nv_api_key
-            )
+            nemotron_client = _get_nemotron_client(nv_api_key)
         except Exception:
             pass
     
@@ -2759,7 +3461,7 @@ def get_agent_insights():
     agent = AgentWorkflow(nemotron_client=nemotron_client)
     insights = agent.get_proactive_insights()
     
-    return jsonify(insights)
+    return ojsonify(insights)
 
 
 @app.route('/api/drains/reset', methods=['POST'])
@@ -2774,7 +3476,7 @@ def reset_drains():
     try:
         with drains_lock:
             count = len(active_drains)
-            active_drains.clear()
+            active_drains = {}
         
         with resolved_tickets_lock:
             ticket_count = len(resolved_tickets)
@@ -2782,7 +3484,7 @@ def reset_drains():
         
         print(f"[RESET] Cleared {count} active drain(s) and {ticket_count} resolved ticket(s)")
         
-        return jsonify({
+        return ojsonify({
             'status': 'success',
             'message': f'Cleared {count} active drain(s) and {ticket_count} resolved ticket(s)',
             'drains_cleared': count,
@@ -2795,49 +3497,60 @@ def reset_drains():
         }), 500
 
 
-# Helper to get NVIDIA API key from environment
-def _get_nv_api_key_from_env():
-    """Retrieve NVIDIA API key from environment variables."""
-    return os.environ.get('NV_API_KEY') or os.environ.get('nv_api_key') or os.environ.get('NVIDIA_API_KEY')
-
-
 # --- Frontend Routes ---
+# Page files live in the project's root folder; resolve their paths once
+_INDEX_PATH = os.path.join(app.root_path, 'index.html')
+_LOADING_PATH = os.path.join(app.root_path, 'loading.html')
+_DASHBOARD_PATH = os.path.join(app.root_path, 'dashboard.html')
+PAGE_MAX_AGE = 60  # seconds browsers may reuse a page before revalidating
+
+def _send_page(path, private=False):
+    """send_file() for a static page with conditional GET and a short max-age.
+    Pages behind auth are sent 'private, no-cache' instead, so every load
+    revalidates (a cheap 304 via the ETag) and shared caches do not keep them."""
+    if private:
+        resp = send_file(path, conditional=True, max_age=None)
+        resp.headers['Cache-Control'] = 'private, no-cache'
+        return resp
+    return send_file(path, conditional=True, max_age=PAGE_MAX_AGE)
+
 @app.route('/')
 def index():
     """Serves the new homepage."""
-    # Serve the index.html from the project's root folder
-    return send_from_directory(app.root_path, 'index.html')
+    return _send_page(_INDEX_PATH)
 
 @app.route('/loading')
 def loading():
     """Serves the loading page that displays loading.gif before redirecting to dashboard.
     Allows demo mode without authentication, but requires auth for normal mode."""
-    # Allow demo mode without auth
-    if request.args.get('demo') == '1':
-        return send_from_directory(app.root_path, 'loading.html')
+    # Allow demo mode without auth. The plain ?demo=1 link is matched on the
+    # raw query bytes so it skips parsing request.args
+    if request.query_string == b'demo=1' or request.args.get('demo') == '1':
+        return _send_page(_LOADING_PATH)
     # Normal mode requires authentication
     if 'user' not in session:
         return redirect(url_for('login'))
-    return send_from_directory(app.root_path, 'loading.html')
+    return _send_page(_LOADING_PATH, private=True)
 
 @app.route('/dashboard')
 @requires_auth
 def dashboard():
     """Serves the main Poyolab dashboard app."""
-    # Serve the dashboard.html from the project's root folder
-    return send_from_directory(app.root_path, 'dashboard.html')
+    return _send_page(_DASHBOARD_PATH, private=True)
 
 
 @app.route('/api/time')
 def api_time():
     """Return the server UTC time for client clock synchronization."""
     try:
-        now = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat()
-        return jsonify({'server_time': now})
+        return ojsonify({'server_time': datetime.now(timezone.utc).isoformat()})
     except Exception:
         return jsonify({'server_time': None})
 
 
+# Edge travel-time fields in priority order; all are read as minutes.
+_EDGE_TIME_KEYS = ('travel_time_minutes', 'travel_time_min', 'travel_time', 'time_minutes', 'time', 'cost')
+
 def _build_graph_from_network(network_obj):
     """Build adjacency map from network information.
     Accepts several shapes: list of edges, or {edges: [...]}
@@ -2867,7 +3580,7 @@ def _build_graph_from_network(network_obj):
             continue
         # determine travel time in seconds
         t = None
-        for k in ('travel_time_minutes','travel_time_min','travel_time','time_minutes','time','cost'):
+        for k in _EDGE_TIME_KEYS:
             if k in e:
                 try:
                     t = float(e[k])
@@ -2877,13 +3590,9 @@ def _build_graph_from_network(network_obj):
         if t is None:
             # default small travel (1 minute)
             t = 1.0
-        # if field was in minutes convert to seconds where key name suggests minutes
-        if 'minute' in (',').join(list(e.keys())).lower() or 'min' in (',').join(list(e.keys())).lower():
-            # assume minutes
-            t_sec = int(round(float(t) * 60))
-        else:
-            # ambiguous: treat as minutes by default
-            t_sec = int(round(float(t) * 60))
+        # every supported field is in minutes (ambiguous ones are treated as
+        # minutes by default), so no per-edge unit sniffing is needed
+        t_sec = int(round(t * 60))
 
         adj.setdefault(a, []).append((b, t_sec))
         adj.setdefault(b, []).append((a, t_sec))
@@ -2891,22 +3600,93 @@ def _build_graph_from_network(network_obj):
     return adj
 
 
+def _index_graph(adj):
+    """Integer-indexed form of an adjacency map: (names, ids, edges).
+
+    names[i] is node i, ids maps a node back to i and edges[i] lists
+    (j, travel_seconds) pairs, so searches hash nothing but the source.
+    """
+    names = list(adj)
+    ids = {name: i for i, name in enumerate(names)}
+    edges = [[(ids[v], w) for v, w in adj[name]] for name in names]
+    return names, ids, edges
+
+
 def _dijkstra(adj, source):
-    import heapq
-    dist = {source: 0}
-    prev = {}
-    h = [(0, source)]
+    """Shortest paths from source; returns ({node: seconds}, {node: previous node}).
+
+    ``adj`` is an adjacency map or its _index_graph() form.
+    """
+    names, ids, edges = adj if isinstance(adj, tuple) else _index_graph(adj)
+    src = ids.get(source)
+    if src is None:
+        return {source: 0}, {}
+    dist = [None] * len(names)  # None = not reached yet
+    prev = [-1] * len(names)
+    dist[src] = 0
+    h = [(0, src)]
+    heappop, heappush = heapq.heappop, heapq.heappush  # locals: one lookup per search
     while h:
-        d, u = heapq.heappop(h)
-        if d != dist.get(u, None):
+        d, u = heappop(h)
+        if d != dist[u]:
             continue
-        for v, w in adj.get(u, []):
+        for v, w in edges[u]:
             nd = d + w
-            if v not in dist or nd < dist[v]:
+            dv = dist[v]
+            if dv is None or nd < dv:
                 dist[v] = nd
                 prev[v] = u
-                heapq.heappush(h, (nd, v))
-    return dist, prev
+                heappush(h, (nd, v))
+    return ({names[i]: d for i, d in enumerate(dist) if d is not None},
+            {names[i]: names[p] for i, p in enumerate(prev) if p >= 0})
+
+
+# Indexed graph and Dijkstra rows per network fingerprint, so optimizer
+# requests on an unchanged network skip the graph build and repeat searches
+GRAPH_CACHE_MAXSIZE = 8
+_graph_cache = OrderedDict()  # fingerprint -> (graph, {source: dist}), oldest first
+_graph_cache_lock = threading.Lock()
+# Held while filling Dijkstra rows, so concurrent optimizer requests on the
+# same network wait for one search per source instead of repeating it
+_graph_rows_lock = threading.Lock()
+
+def _network_fingerprint(network_obj):
+    payload = json.dumps(network_obj, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+def _cached_graph(network_obj):
+    """Return (graph, rows) for network_obj: its _index_graph() form and a
+    dict memoizing Dijkstra rows by source.
+
+    Both are shared between requests and must be treated as read-only.
+    """
+    try:
+        key = _network_fingerprint(network_obj)
+    except Exception:
+        return _index_graph(_build_graph_from_network(network_obj)), {}
+    with _graph_cache_lock:
+        entry = _graph_cache.get(key)
+        if entry is None:
+            # built under the lock (it is O(edges)) so it happens once per network
+            entry = _graph_cache[key] = (_index_graph(_build_graph_from_network(network_obj)), {})
+            while len(_graph_cache) > GRAPH_CACHE_MAXSIZE:
+                _graph_cache.popitem(last=False)
+        else:
+            _graph_cache.move_to_end(key)
+        return entry
+
+def _distance_table(adj, sources, table=None):
+    """Shortest travel seconds from each source: {source: {node: seconds}}.
+
+    Each distinct source is searched once, and rows already in ``table`` are
+    reused; nodes missing from a row are unreachable from that source.
+    """
+    if table is None:
+        table = {}
+    for src in sources:
+        if src not in table:
+            table[src] = _dijkstra(adj, src)[0]
+    return table
 
 
 @app.route('/api/optimizer/compute')
@@ -2915,28 +3695,25 @@ def api_optimizer_compute():
     """Compute courier routes to prevent cauldron overflow.
     Returns a greedy schedule and the minimal number of couriers found by packing.
     Query params:
-      unload_min (default 15)
       safety_min (default 0)
+      unload_min is accepted but ignored: unloading happens after the return
+      to the market, so it bounds no cauldron deadline.
     """
     try:
-        unload_min = float(request.args.get('unload_min') or 15.0)
         safety_min = float(request.args.get('safety_min') or 0.0)
     except Exception:
-        unload_min = 15.0
         safety_min = 0.0
 
     # get live status
     try:
-        status_resp = cauldron_status()
-        if hasattr(status_resp, 'get_json'):
-            status = status_resp.get_json()
-        else:
-            status = status_resp
+        status, error = _status_rows()
+        if error:
+            return jsonify({'error': f'Could not compute status: {error}'}), 500
     except Exception as e:
         return jsonify({'error': f'Could not compute status: {e}'}), 500
 
     # Build list of tasks: cauldrons with time_to_full_seconds
-    now = datetime.utcnow().replace(tzinfo=timezone.utc)
+    now = datetime.now(timezone.utc)
     tasks = []
     for s in (status or []):
         try:
@@ -2945,82 +3722,165 @@ def api_optimizer_compute():
             pct = s.get('percent_full') or 0
             if ttf is None:
                 continue
-            deadline = now + timedelta(seconds=int(ttf) - int(safety_min * 60))
-            tasks.append({'id': cid, 'deadline': deadline, 'ttf_seconds': int(ttf), 'percent_full': pct})
+            # deadlines stay plain int seconds after `now`; datetimes are
+            # only built for the response
+            deadline_s = int(ttf) - int(safety_min * 60)
+            tasks.append({'id': cid, 'deadline_s': deadline_s, 'ttf_seconds': int(ttf), 'percent_full': pct})
         except Exception:
             continue
 
     # load network adjacency
     network_obj = factory_static_data.get('network')
-    adj = _build_graph_from_network(network_obj)
+    graph, dist_rows = _cached_graph(network_obj)
 
     market = factory_static_data.get('market') or {}
     market_id = market.get('id') or market.get('name') or 'market'
 
     # precompute shortest paths among market and task nodes to speed feasibility checks
     nodes_of_interest = [market_id] + [t['id'] for t in tasks]
-    dist_matrix = {}
-    for src in nodes_of_interest:
-        dists, _ = _dijkstra(adj, src)
-        dist_matrix[src] = dists
+    with _graph_rows_lock:
+        dist_matrix = _distance_table(graph, nodes_of_interest, dist_rows)
 
     # map id->task
     task_map = {t['id']: t for t in tasks}
     # sort by deadline ascending
-    tasks.sort(key=lambda x: x['deadline'])
+    tasks.sort(key=lambda x: x['deadline_s'])
 
-    routes = []  # each route: {'seq':[ids], 'arrivals':{id:datetime}, 'impossible':bool}
+    routes = []  # each route: {'seq':[ids], 'arrivals':{id:seconds after now}, 'impossible':bool}
 
     def travel_seconds(u, v):
-        if u in dist_matrix and v in dist_matrix[u]:
-            return dist_matrix[u][v]
-        # fallback to dijkstra on-the-fly
-        dists, _ = _dijkstra(adj, u)
+        dists = dist_matrix.get(u)
+        if dists is None:
+            # not a precomputed source: run dijkstra once and keep the row
+            dists = dist_matrix[u] = _dijkstra(graph, u)[0]
+        # a missing target is unreachable; no need to search again
         return dists.get(v)
 
     def simulate_route_with_seq(seq):
-        # simulate starting at market now, visiting seq in order; return (feasible:boolean, arrivals:dict)
-        tcur = now
+        # simulate starting at market now, visiting seq in order; return
+        # (feasible:boolean, arrivals:dict). Travel times are whole seconds,
+        # so arrivals are kept as integer seconds after `now` and compared
+        # with each task's deadline offset; datetimes are only built for
+        # the response.
+        tcur = 0
         arrivals = {}
         prev = market_id
         for node in seq:
             travel = travel_seconds(prev, node)
             if travel is None:
                 return False, None
-            tcur = tcur + timedelta(seconds=travel)
+            tcur += travel
             arrivals[node] = tcur
             prev = node
-        # return to market
-        travel_back = travel_seconds(prev, market_id)
-        if travel_back is None:
+        # return to market (the unload time after it bounds no deadline)
+        if travel_seconds(prev, market_id) is None:
             return False, None
-        tcur = tcur + timedelta(seconds=travel_back)
-        # include unload time at market
-        tcur = tcur + timedelta(minutes=unload_min)
         # check deadlines
         for node, at in arrivals.items():
             task = task_map.get(node)
-            if task and at > task['deadline']:
+            if task and at > task['deadline_s']:
                 return False, None
         return True, arrivals
 
+    def route_profile(r):
+        # (slack, pre_max, suf_max) for a feasible route, or None when its
+        # arrivals cannot bound an insertion. slack[i] = least
+        # (deadline - arrival) over stops i..; pre_max[i] / suf_max[i] =
+        # latest arrival before stop i / from stop i on.
+        seq = r['seq']
+        arrivals = r.get('arrivals') or {}
+        if r.get('impossible') or len(set(seq)) != len(seq) or any(n not in arrivals for n in seq):
+            return None
+        inf = float('inf')
+        slack = [inf] * (len(seq) + 1)
+        suf_max = [-inf] * (len(seq) + 1)
+        for i in range(len(seq) - 1, -1, -1):
+            t = task_map.get(seq[i])
+            own = t['deadline_s'] - arrivals[seq[i]] if t else inf
+            slack[i] = min(own, slack[i + 1])
+            suf_max[i] = max(arrivals[seq[i]], suf_max[i + 1])
+        pre_max = [-inf] * (len(seq) + 1)
+        for i, n in enumerate(seq):
+            pre_max[i + 1] = max(pre_max[i], arrivals[n])
+        return slack, pre_max, suf_max
+
+    def inserted_arrivals(r, pos, tid, arr_t, delta):
+        # arrivals after inserting tid at pos: earlier stops keep theirs,
+        # later ones shift by delta (what simulate_route_with_seq would give)
+        seq = r['seq']
+        arrivals = {n: r['arrivals'][n] for n in seq[:pos]}
+        arrivals[tid] = arr_t
+        for n in seq[pos:]:
+            arrivals[n] = r['arrivals'][n] + delta
+        return arrivals
+
+    # No route reaches a task sooner than the direct market->task path (the
+    # rows are true shortest paths; a negative edge would already keep
+    # _dijkstra from finishing), so a task that misses its deadline that way
+    # or cannot get back to the market fits no route and skips the search
+    def admissible(tid):
+        # deadlines come from task_map, as in simulate_route_with_seq
+        d_out = travel_seconds(market_id, tid)
+        if d_out is None or d_out > task_map[tid]['deadline_s']:
+            return False
+        return travel_seconds(tid, market_id) is not None
+
     # Insertion-based greedy: try to insert each task into existing routes at best position
     for task in tasks:
         placed = False
-        best_choice = None  # (route_idx, insert_pos, arrivals)
-        for ri, r in enumerate(routes):
+        best_choice = None  # (route_idx, insert_pos, new_seq, latest_arrival, arrivals)
+        tid = task['id']
+        t_task = task_map.get(tid)
+        for ri, r in enumerate(routes if admissible(tid) else ()):
             seq = r['seq']
+            profile = route_profile(r) if tid not in seq else None
             # try all insertion positions 0..len(seq)
             for pos in range(0, len(seq)+1):
+                if profile is not None:
+                    # Inserting between a and b delays every later stop by
+                    # exactly d(a,t) + d(t,b) - d(a,b); skip positions where
+                    # that, or the arrival at t itself, misses a deadline
+                    slack, pre_max, suf_max = profile
+                    a = seq[pos-1] if pos else market_id
+                    d_at = travel_seconds(a, tid)
+                    if d_at is None:
+                        continue
+                    arr_t = (r['arrivals'][a] if pos else 0) + d_at
+                    if t_task and arr_t > t_task['deadline_s']:
+                        continue
+                    if pos < len(seq):
+                        d_tb = travel_seconds(tid, seq[pos])
+                        if d_tb is None:
+                            continue
+                        d_ab = travel_seconds(a, seq[pos])
+                        if d_ab is not None and d_at + d_tb - d_ab > slack[pos]:
+                            continue
+                        delta = None if d_ab is None else d_at + d_tb - d_ab
+                    else:
+                        # tid becomes the last stop, so it must reach the market
+                        if travel_seconds(tid, market_id) is None:
+                            continue
+                        delta = 0
+                    if delta is not None:
+                        # feasible: score it from the profile without
+                        # re-simulating; arrivals are built for the winner only
+                        latest_arrival = max(pre_max[pos], arr_t, suf_max[pos] + delta)
+                        if best_choice is None or latest_arrival < best_choice[3]:
+                            best_choice = (ri, pos, None, latest_arrival, (arr_t, delta))
+                        continue
                 new_seq = seq[:pos] + [task['id']] + seq[pos:]
                 ok, arrivals = simulate_route_with_seq(new_seq)
                 if ok:
                     # choose the insertion that yields earliest latest-arrival (tightest)
-                    latest_arrival = max(arrivals.values()) if arrivals else now
+                    latest_arrival = max(arrivals.values()) if arrivals else 0
                     if best_choice is None or latest_arrival < best_choice[3]:
                         best_choice = (ri, pos, new_seq, latest_arrival, arrivals)
         if best_choice:
             ri, pos, new_seq, _, arrivals = best_choice
+            if new_seq is None:
+                seq = routes[ri]['seq']
+                arrivals = inserted_arrivals(routes[ri], pos, tid, *arrivals)
+                new_seq = seq[:pos] + [tid] + seq[pos:]
             routes[ri]['seq'] = new_seq
             routes[ri]['arrivals'] = arrivals
             placed = True
@@ -3033,19 +3893,26 @@ def api_optimizer_compute():
                 # cannot service even alone -> impossible
                 routes.append({'seq': [task['id']], 'arrivals': {}, 'impossible': True})
 
-    # format response
-    resp_routes = []
-    for i, r in enumerate(routes):
-        resp_routes.append({
-            'courier': i+1,
-            'sequence': r['seq'],
-            'arrivals': {k: v.isoformat() for k, v in (r.get('arrivals') or {}).items()},
-            'impossible': bool(r.get('impossible', False))
-        })
+    # format response; route objects are built as they are encoded
+    def resp_routes():
+        for i, r in enumerate(routes):
+            yield {
+                'courier': i+1,
+                'sequence': r['seq'],
+                'arrivals': {k: (now + timedelta(seconds=v)).isoformat() for k, v in (r.get('arrivals') or {}).items()},
+                'impossible': bool(r.get('impossible', False))
+            }
 
-    return jsonify({
+    if _wants_ndjson():
+        def lines():
+            yield {'type': 'summary', 'required_couriers': len(routes), 'now': now.isoformat()}
+            for route in resp_routes():
+                yield {'type': 'route', **route}
+        return ndjson_response(lines())
+
+    return ojsonify({
         'required_couriers': len(routes),
-        'routes': resp_routes,
+        'routes': list(resp_routes()),
         'now': now.isoformat()
     })
 
@@ -1,61 +1,70 @@
-import struct
+def _skip_sub_blocks(data, i):
+    """Return the index just past a chain of data sub-blocks starting at i.
+
+    Raises IndexError if the chain runs past the end of the data.
+    """
+    while True:
+        block_size = data[i]
+        i += 1
+        if block_size == 0:
+            return i
+        i = min(i + block_size, len(data))
 
 def get_gif_duration(filepath):
     """Read GIF file and calculate total duration from frame delays."""
     try:
+        # One read, then walk the bytes by index instead of a read() and
+        # struct.unpack() call per field
         with open(filepath, 'rb') as f:
-            # Check GIF signature
-            if f.read(6) not in (b'GIF87a', b'GIF89a'):
-                return None
-            
-            # Skip logical screen descriptor
-            f.read(7)
-            
-            # Check for global color table
-            flags = struct.unpack('B', f.read(1))[0]
-            f.seek(-1, 1)
-            
-            total_duration = 0
-            frame_count = 0
-            
-            while True:
-                try:
-                    block = f.read(1)
-                    if not block:
-                        break
-                    
-                    if block == b'\x21':  # Extension
-                        label = f.read(1)
-                        if label == b'\xf9':  # Graphic Control Extension
-                            f.read(1)  # block size
-                            f.read(1)  # packed fields
-                            delay = struct.unpack('<H', f.read(2))[0]  # delay time in 1/100 sec
-                            total_duration += delay * 10  # convert to ms
-                            frame_count += 1
-                        # Skip rest of extension
-                        while True:
-                            block_size = struct.unpack('B', f.read(1))[0]
-                            if block_size == 0:
-                                break
-                            f.read(block_size)
-                    elif block == b'\x2c':  # Image descriptor
-                        f.read(9)  # skip image descriptor
-                        # Skip local color table if present
-                        flags = struct.unpack('B', f.read(1))[0]
-                        f.seek(-1, 1)
-                        # Skip image data
-                        f.read(1)  # LZW minimum code size
-                        while True:
-                            block_size = struct.unpack('B', f.read(1))[0]
-                            if block_size == 0:
-                                break
-                            f.read(block_size)
-                    elif block == b'\x3b':  # Trailer
-                        break
-                except:
+            data = f.read()
+        n = len(data)
+        
+        # Check GIF signature
+        if data[:6] not in (b'GIF87a', b'GIF89a'):
+            return None
+        
+        # Skip logical screen descriptor
+        i = min(6 + 7, n)
+        
+        # Check for global color table
+        flags = data[i]
+        
+        total_duration = 0
+        frame_count = 0
+        
+        while True:
+            try:
+                if i >= n:
+                    break
+                block = data[i]
+                i += 1
+                
+                if block == 0x21:  # Extension
+                    label = data[i] if i < n else None
+                    i = min(i + 1, n)
+                    if label == 0xf9:  # Graphic Control Extension
+                        i = min(i + 2, n)  # block size, packed fields
+                        if i + 2 > n:
+                            break
+                        delay = data[i] | (data[i + 1] << 8)  # delay time in 1/100 sec
+                        i += 2
+                        total_duration += delay * 10  # convert to ms
+                        frame_count += 1
+                    # Skip rest of extension
+                    i = _skip_sub_blocks(data, i)
+                elif block == 0x2c:  # Image descriptor
+                    i = min(i + 9, n)  # skip image descriptor
+                    # Skip local color table if present
+                    flags = data[i]
+                    # Skip image data
+                    i = min(i + 1, n)  # LZW minimum code size
+                    i = _skip_sub_blocks(data, i)
+                elif block == 0x3b:  # Trailer
                     break
-            
-            return total_duration, frame_count
+            except:
+                break
+        
+        return total_duration, frame_count
     except Exception as e:
         return None
 
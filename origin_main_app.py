@@ -1,15 +1,20 @@
-from flask import Flask, jsonify, request, render_template, send_from_directory, redirect, url_for, session
+from flask import Flask, Response, jsonify, request, render_template, redirect, url_for, session, stream_with_context
 from flask_cors import CORS
 from authlib.integrations.flask_client import OAuth
-from functools import wraps
+from functools import lru_cache, wraps
 from dotenv import load_dotenv
 import requests
+import hashlib
+import heapq
+import json
+import logging
 import random
 import time
 import os
+import re
 import threading
 import statistics
-import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from urllib.parse import quote_plus, urlencode
 
@@ -24,10 +29,24 @@ except Exception:
     OpenAI = None
     _HAS_NEMOTRON = False
 
+@lru_cache(maxsize=8)
+def _nv_client(api_key):
+    """Reuse one Nemotron client (and its connection pool) per API key."""
+    return OpenAI(base_url="https://integrate.api.nvidia.com/v1", api_key=api_key)
+
 # --- Setup ---
 app = Flask(__name__)
 CORS(app)
 
+# Optional log level override (e.g. LOG_LEVEL=DEBUG to include Nemotron tracebacks);
+# an unknown name falls back to INFO instead of failing at import
+if os.environ.get("LOG_LEVEL"):
+    _log_level = logging.getLevelName(os.environ["LOG_LEVEL"].strip().upper())
+    if not isinstance(_log_level, int):
+        print(f"[log] Unknown LOG_LEVEL {os.environ['LOG_LEVEL']!r}, using INFO")
+        _log_level = logging.INFO
+    app.logger.setLevel(_log_level)
+
 # Session configuration
 app.secret_key = os.environ.get("SECRET_KEY")
 if not app.secret_key:
@@ -48,6 +67,13 @@ oauth.register(
 # ### EOG API Base URL ###
 EOG_API_BASE_URL = "https://hackutd2025.eog.systems"
 
+# --- Shared HTTP client ---
+# One pooled requests.Session for every EOG call so connections are reused
+# across requests. Every call passes a timeout so a hung backend can't pin a
+# worker.
+HTTP_TIMEOUT = 5  # seconds
+HTTP = requests.Session()
+
 # --- Authentication Decorator ---
 def requires_auth(f):
     @wraps(f)
@@ -57,6 +83,70 @@ def requires_auth(f):
         return f(*args, **kwargs)
     return decorated
 
+# --- Request Coalescing ("stampede protection") ---
+_inflight = {}  # {key: Future} for computations currently running
+_inflight_lock = threading.Lock()
+
+def _clone_response(result):
+    """Give each waiting caller its own Response object so per-request
+    header/cookie handling never touches the shared leader response."""
+    if isinstance(result, tuple):
+        return (_clone_response(result[0]),) + result[1:]
+    if isinstance(result, Response):
+        return app.response_class(result.get_data(), status=result.status_code, mimetype=result.mimetype)
+    return result
+
+def coalesce(key):
+    """Collapse concurrent calls to a view into a single computation.
+    The first caller computes the result; callers arriving while it is in
+    flight wait on the same Future instead of starting a duplicate."""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            with _inflight_lock:
+                fut = _inflight.get(key)
+                is_leader = fut is None
+                if is_leader:
+                    fut = _inflight[key] = Future()
+            if not is_leader:
+                return _clone_response(fut.result())
+            try:
+                result = f(*args, **kwargs)
+                fut.set_result(result)
+                return result
+            except BaseException as e:
+                fut.set_exception(e)
+                raise
+            finally:
+                with _inflight_lock:
+                    _inflight.pop(key, None)
+        return decorated
+    return decorator
+
+# --- Short-lived result caching ---
+def ttl_cache(ttl):
+    """Cache a helper's no-argument result for `ttl` seconds so bursts of
+    chat/dashboard requests share one computation. Calls made with arguments
+    bypass the cache; `fresh=True` forces a recompute. Error dicts are not cached."""
+    def decorator(f):
+        lock = threading.RLock()
+        state = {'value': None, 'expires': 0.0}
+        @wraps(f)
+        def decorated(*args, fresh=False, **kwargs):
+            if args or kwargs:
+                return f(*args, **kwargs)
+            with lock:
+                if not fresh and time.monotonic() < state['expires']:
+                    return state['value']
+            value = f()
+            if not (isinstance(value, dict) and 'error' in value):
+                with lock:
+                    state['value'] = value
+                    state['expires'] = time.monotonic() + ttl
+            return value
+        return decorated
+    return decorator
+
 # --- Auth Routes ---
 @app.route('/login')
 def login():
@@ -101,14 +191,14 @@ def load_static_factory_data():
     """
     print("Loading static factory data from EOG API...")
     try:
-        cauldrons = requests.get(EOG_API_BASE_URL + "/api/Information/cauldrons").json()
-        network = requests.get(EOG_API_BASE_URL + "/api/Information/network").json()
-        market = requests.get(EOG_API_BASE_URL + "/api/Information/market").json()
-        couriers = requests.get(EOG_API_BASE_URL + "/api/Information/couriers").json()
+        cauldrons = HTTP.get(EOG_API_BASE_URL + "/api/Information/cauldrons", timeout=HTTP_TIMEOUT).json()
+        network = HTTP.get(EOG_API_BASE_URL + "/api/Information/network", timeout=HTTP_TIMEOUT).json()
+        market = HTTP.get(EOG_API_BASE_URL + "/api/Information/market", timeout=HTTP_TIMEOUT).json()
+        couriers = HTTP.get(EOG_API_BASE_URL + "/api/Information/couriers", timeout=HTTP_TIMEOUT).json()
         
         meta = None
         try:
-            meta = requests.get(EOG_API_BASE_URL + '/api/Data/metadata', timeout=5).json()
+            meta = HTTP.get(EOG_API_BASE_URL + '/api/Data/metadata', timeout=5).json()
         except Exception:
             meta = None
 
@@ -139,7 +229,7 @@ def load_static_factory_data():
             else:
                 per_rate = None
                 try:
-                    per_meta_resp = requests.get(EOG_API_BASE_URL + f"/api/Data/metadata?cauldronId={cid}", timeout=5)
+                    per_meta_resp = HTTP.get(EOG_API_BASE_URL + f"/api/Data/metadata?cauldronId={cid}", timeout=5)
                     if per_meta_resp.status_code == 200:
                         per_meta = per_meta_resp.json()
                         if isinstance(per_meta, dict):
@@ -216,7 +306,7 @@ def api_compute_rates():
 
 def _compute_rates_from_history(sample_limit=500):
     try:
-        raw = requests.get(EOG_API_BASE_URL + '/api/Data?start_date=0&end_date=2000000000', timeout=20).json()
+        raw = HTTP.get(EOG_API_BASE_URL + '/api/Data?start_date=0&end_date=2000000000', timeout=20).json()
     except Exception:
         return {}
 
@@ -308,6 +398,45 @@ factory_static_data = load_static_factory_data()
 if factory_static_data is None:
     exit()
 
+def _build_cauldron_alias_index(cauldrons):
+    """Map each lowercase alias (cauldron id and first name token) to its
+    cauldron id, and compile one regex that finds every alias in a single pass.
+    Also returns each cauldron's list position so the first cauldron in the
+    list still wins when a message names several."""
+    aliases = {}
+    rank = {}
+    for idx, c in enumerate(cauldrons):
+        cid = c['id']
+        rank[cid] = idx
+        for alias in (cid.lower(), c['name'].split(" ")[0].lower()):
+            if alias:
+                aliases.setdefault(alias, cid)
+    pattern = None
+    if aliases:
+        pattern = re.compile('|'.join(re.escape(a) for a in sorted(aliases, key=len, reverse=True)))
+    return aliases, rank, pattern
+
+CAULDRON_ALIASES, CAULDRON_RANK, CAULDRON_ALIAS_RE = _build_cauldron_alias_index(factory_static_data['cauldrons'])
+
+# Static factory facts used by the agent; factory_static_data never changes shape after load
+NUM_COURIERS = len(factory_static_data['couriers'])
+MARKET_NAME = factory_static_data['market'].get('name', 'The Enchanted Market')
+
+# The optimize/routes bonus reply only depends on the static facts above
+_BONUS_RESPONSE = (
+    "This is the EOG Bonus! Here is how I would solve it:\n"
+    f"1. **Use Forecast:** First, I call my `forecast_fill_times()` tool to get a 'deadline' for each cauldron.\n"
+    f"2. **Use Network Map:** I will use the **`/api/Information/network`** data to calculate travel times between the {MARKET_NAME} and all urgent cauldrons.\n"
+    f"3. **Account for Constraints:** I'll add the 15-minute `unload_time` at the market, plus the `drain_rate` (from `/api/Data/metadata`) to calculate drain time.\n"
+    f"4. **Find Minimum Witches:** I'll run a VRP (Vehicle Routing Problem) algorithm to find the minimum number of the **{NUM_COURIERS} available couriers** (from `/api/Information/couriers`) needed to service all cauldrons before they overflow."
+)
+
+def _find_cauldron_in_message(msg_l):
+    if CAULDRON_ALIAS_RE is None:
+        return None
+    hits = {CAULDRON_ALIASES[m.group(0)] for m in CAULDRON_ALIAS_RE.finditer(msg_l)}
+    return min(hits, key=CAULDRON_RANK.get) if hits else None
+
 forecast_state = {}
 
 try:
@@ -319,10 +448,11 @@ except Exception:
 
 @app.route('/api/cauldron/levels')
 @requires_auth
+@coalesce('get_cauldron_levels')
 def get_cauldron_levels():
     try:
         live_data_url = EOG_API_BASE_URL + "/api/Data" 
-        response = requests.get(live_data_url)
+        response = HTTP.get(live_data_url, timeout=HTTP_TIMEOUT)
         live_levels_data = response.json() 
         
     except Exception as e:
@@ -421,7 +551,7 @@ def check_discrepancies():
     alerts = []
     try:
         ticket_url = EOG_API_BASE_URL + "/api/Tickets"
-        real_tickets = requests.get(ticket_url).json()
+        real_tickets = HTTP.get(ticket_url, timeout=HTTP_TIMEOUT).json()
         
         history_url = EOG_API_BASE_URL + "/api/Data/metadata" 
         
@@ -455,17 +585,23 @@ def check_discrepancies():
 
 @app.route('/api/logistics/forecast')
 @requires_auth
-def forecast_fill_times(live_levels_data=None):
+def forecast_fill_times():
+    return jsonify(_forecast_fill_times(fresh=request.args.get('fresh') == '1'))
+
+@ttl_cache(5.0)
+def _forecast_fill_times(live_levels_data=None):
+    """Forecast minutes-to-full per cauldron. Returns a list of forecasts, or
+    an {'error': ...} dict when live levels could not be fetched."""
     forecasts = []
     
     if live_levels_data is None:
         try:
             live_levels_response = get_cauldron_levels()
             if live_levels_response.status_code != 200:
-                return jsonify({"error": "Could not get live levels for forecast."})
+                return {"error": "Could not get live levels for forecast."}
             live_levels_data = live_levels_response.get_json() 
         except Exception as e:
-            return jsonify({"error": str(e)})
+            return {"error": str(e)}
 
     for cauldron in live_levels_data:
         fill_rate = cauldron['fill_rate_per_min'] 
@@ -481,13 +617,11 @@ def forecast_fill_times(live_levels_data=None):
                     "time_to_full_min": round(time_to_full_min, 1)
                 })
     
-    if live_levels_data is not None:
-        return forecasts
-    
-    return jsonify(forecasts)
+    return forecasts
 
 @app.route('/api/cauldron/status')
 @requires_auth
+@coalesce('cauldron_status')
 def cauldron_status():
     try:
         live_levels_response = get_cauldron_levels()
@@ -498,7 +632,7 @@ def cauldron_status():
         return jsonify({"error": f"Could not fetch live levels: {e}"}), 500
 
     try:
-        forecasts = forecast_fill_times(live_levels_data=live_levels)
+        forecasts = _forecast_fill_times(live_levels_data=live_levels)
         
     except Exception as e:
         print(f"Error in forecast_fill_times: {e}")
@@ -583,7 +717,7 @@ def data_historic():
     cauldron_id = request.args.get('cauldron_id')
 
     try:
-        raw = requests.get(EOG_API_BASE_URL + '/api/Data').json()
+        raw = HTTP.get(EOG_API_BASE_URL + '/api/Data', timeout=HTTP_TIMEOUT).json()
     except Exception as e:
         return jsonify({'error': f'Could not fetch /api/Data: {e}'}), 500
 
@@ -646,17 +780,35 @@ def _extract_ticket_amount(ticket):
 @app.route('/api/tickets/match')
 @requires_auth
 def tickets_match():
+    result = _tickets_match(fresh=request.args.get('fresh') == '1')
+    if 'error' in result:
+        return jsonify(result), 500
+    # suspicious_indices is an internal index for the agent, not part of the API
+    return jsonify({k: v for k, v in result.items() if k != 'suspicious_indices'})
+
+@ttl_cache(5.0)
+@coalesce('tickets_match')
+def _tickets_match():
+    """Match tickets to drain events. Returns {'matches', 'unmatched_drains'}
+    plus the internal 'suspicious_indices' (positions in 'matches' flagged
+    suspicious), or an {'error': ...} dict when the EOG API could not be
+    reached."""
+    # Fetch tickets and history concurrently so we only wait for the slower of the two
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        tickets_future = ex.submit(HTTP.get, EOG_API_BASE_URL + '/api/Tickets', timeout=HTTP_TIMEOUT)
+        data_future = ex.submit(HTTP.get, EOG_API_BASE_URL + '/api/Data', timeout=HTTP_TIMEOUT)
+
     try:
-        tickets_raw = requests.get(EOG_API_BASE_URL + '/api/Tickets').json()
+        tickets_raw = tickets_future.result().json()
     except Exception as e:
-        return jsonify({'error': f'Could not fetch /api/Tickets: {e}'}), 500
+        return {'error': f'Could not fetch /api/Tickets: {e}'}
 
     tickets_list = tickets_raw if isinstance(tickets_raw, list) else (tickets_raw.get('transport_tickets') if isinstance(tickets_raw, dict) and isinstance(tickets_raw.get('transport_tickets'), list) else (tickets_raw.get('tickets') if isinstance(tickets_raw, list) else []))
 
     try:
-        data_raw = requests.get(EOG_API_BASE_URL + '/api/Data').json()
+        data_raw = data_future.result().json()
     except Exception as e:
-        return jsonify({'error': f'Could not fetch /api/Data: {e}'}), 500
+        return {'error': f'Could not fetch /api/Data: {e}'}
 
     data_list = data_raw if isinstance(data_raw, list) else (data_raw.get('data') if isinstance(data_raw, dict) and isinstance(data_raw.get('data'), list) else [])
 
@@ -679,6 +831,7 @@ def tickets_match():
         series_map[cid].sort(key=lambda x: x[0])
 
     results = []
+    suspicious_indices = []  # positions in `results` flagged suspicious
     unmatched_drains = []
 
     def get_static(cauldron_id):
@@ -774,6 +927,8 @@ def tickets_match():
 
         app.logger.info(f"[tickets_match] ticket={ticket_id} cauldron={cauldron_id} day={match_day} ticket_amount={amount} calculated={calculated} diff={diff} suspicious={suspicious}")
 
+        if suspicious:
+            suspicious_indices.append(len(results))
         results.append({
             'ticket_id': ticket_id,
             'cauldron_id': cauldron_id,
@@ -792,25 +947,217 @@ def tickets_match():
                 for e in events:
                     unmatched_drains.append({'cauldron_id': cid, 'day': day, 'event': e})
 
-    return jsonify({'matches': results, 'unmatched_drains': unmatched_drains})
+    return {'matches': results, 'suspicious_indices': suspicious_indices, 'unmatched_drains': unmatched_drains}
 
 @app.route('/api/logistics/dispatch_courier', methods=['POST'])
 @requires_auth
 def dispatch_courier():
     data = request.json
-    cauldron_id = data.get('cauldron_id')
-    
+    result = _dispatch_courier(data.get('cauldron_id'))
+    if result['status'] != 'success':
+        return jsonify(result), 400
+    return jsonify(result)
+
+def _dispatch_courier(cauldron_id):
+    """Simulated courier dispatch shared by the route and the agent."""
     cauldron_data = next((c for c in factory_static_data['cauldrons'] if c['id'] == cauldron_id), None)
     
     if not cauldron_data:
-        return jsonify({"status": "error", "message": "Invalid cauldron ID."}), 400
+        return {"status": "error", "message": "Invalid cauldron ID."}
     
     print(f"SIMULATED DISPATCH: Courier sent to {cauldron_data['name']}")
     
-    return jsonify({
+    return {
         "status": "success",
         "message": f"Courier witch dispatched to {cauldron_data['name']}. (Simulation)"
-    })
+    }
+
+_HELP_RESPONSE = "I am connected to the EOG API. I can **check tickets**, **forecast** fill times, **dispatch** couriers, or **optimize routes**."
+
+# --- Agent Intent Routing ---
+# Keyword groups in precedence order: when a message hits several groups the
+# earliest one wins, matching the original if/elif ladder. A single regex
+# pass finds every keyword instead of one substring scan per keyword.
+_INTENT_KEYWORDS = (
+    ('tickets', ('suspicious', 'anomaly', 'ticket')),
+    ('forecast', ('forecast', 'full')),
+    ('dispatch', ('dispatch', 'empty')),
+    ('optimize', ('optimize', 'routes', 'witches')),
+)
+INTENT_MAP = {kw: intent for intent, kws in _INTENT_KEYWORDS for kw in kws}
+_INTENT_PRIORITY = {intent: rank for rank, (intent, _) in enumerate(_INTENT_KEYWORDS)}
+INTENT_RE = re.compile('|'.join(re.escape(kw) for kw in INTENT_MAP))
+
+def _classify_agent_intent(msg_l):
+    intents = {INTENT_MAP[m.group(0)] for m in INTENT_RE.finditer(msg_l)}
+    return min(intents, key=_INTENT_PRIORITY.get) if intents else None
+
+def _agent_tickets(msg_l, agent_plan):
+    agent_plan.append("Plan: User asked about discrepancies. I will call the real `tickets_match()` tool.")
+    
+    match_data = _tickets_match()
+    
+    unmatched_drains = match_data.get('unmatched_drains', [])
+    
+    # Only visit the rows _tickets_match already flagged as suspicious
+    matches = match_data.get('matches', [])
+    suspicious_indices = match_data.get('suspicious_indices', ())
+    parts = ["I've checked the tickets and found some problems:\n"]
+    for i in suspicious_indices:
+        match = matches[i]
+        parts.append(f"  - Suspicious Ticket: {match['ticket_id']} ({match['cauldron_id']}). Reason: {match['reason']}\n")
+    found = bool(suspicious_indices)
+    
+    if found or unmatched_drains:
+        agent_plan.append("Tool Result: Found discrepancies.")
+        for drain in unmatched_drains:
+            parts.append(f"  - Unmatched Drain: {drain['cauldron_id']} on {drain['day']} for {drain['event']['drained']:.1f}L.\n")
+        return "".join(parts)
+    agent_plan.append("Tool Result: No discrepancies found.")
+    return "I've checked all tickets against the historical data. All potion flows are accounted for."
+
+def _agent_forecast(msg_l, agent_plan):
+    agent_plan.append("Plan: User asked for forecasts. I will call `forecast_fill_times()`.")
+    
+    forecasts = _forecast_fill_times()
+    agent_plan.append(f"Tool Result: {forecasts}")
+    if isinstance(forecasts, dict):
+        return f"I couldn't get the live forecast: {forecasts.get('error')}"
+    
+    parts = ["Here is the live forecast (top 5):\n"]
+    for f in heapq.nsmallest(5, forecasts, key=lambda x: x.get('time_to_full_min', 9999)):
+        parts.append(f"  - {f['name']} ({f['cauldron_id']}) will be full in {f['time_to_full_min']} minutes.\n")
+    return "".join(parts)
+
+def _agent_dispatch(msg_l, agent_plan):
+    cauldron_id_to_dispatch = _find_cauldron_in_message(msg_l)
+    
+    if not cauldron_id_to_dispatch:
+        return "Which cauldron (e.g., cauldron_001) should I dispatch to?"
+
+    agent_plan.append(f"Plan: User wants to dispatch to {cauldron_id_to_dispatch}. I will call `dispatch_courier()`.")
+    
+    dispatch_result = _dispatch_courier(cauldron_id_to_dispatch)
+    
+    agent_plan.append(f"Tool Result: {dispatch_result['status']}.")
+    return dispatch_result['message']
+
+def _agent_optimize(msg_l, agent_plan):
+    agent_plan.append("Plan: User asked for the Bonus. I will explain the solution using the live API data.")
+    
+    return _BONUS_RESPONSE
+
+# Intents whose local reply is a raw tool summary worth rewording with Nemotron.
+# Those summaries are short, so the token budget is kept small.
+_POLISH_INTENTS = frozenset({'tickets', 'forecast'})
+NEMOTRON_MAX_TOKENS = 256
+NEMOTRON_THINKING_BUDGET = {"min_thinking_tokens": 128, "max_thinking_tokens": 256}
+
+AGENT_HANDLERS = {
+    'tickets': _agent_tickets,
+    'forecast': _agent_forecast,
+    'dispatch': _agent_dispatch,
+    'optimize': _agent_optimize,
+}
+
+def _iter_stream_deltas(completion):
+    """Yield (reasoning, content) pairs from a streaming Nemotron completion."""
+    for chunk in completion:
+        try:
+            delta = chunk.choices[0].delta
+        except Exception:
+            delta = None
+
+        if delta is None:
+            continue
+
+        # SDK deltas always carry `content`; only fall back to the rarer fields
+        try:
+            content = delta.content
+        except AttributeError:
+            content = None
+        if content is None:
+            content = getattr(delta, 'text', None)
+        yield getattr(delta, 'reasoning_content', None), content
+
+def _nemotron_create(client, messages, stream):
+    return client.chat.completions.create(
+        model="nvidia/nvidia-nemotron-nano-9b-v2",
+        messages=messages,
+        temperature=0.6,
+        top_p=0.95,
+        max_tokens=NEMOTRON_MAX_TOKENS,
+        frequency_penalty=0,
+        presence_penalty=0,
+        stream=stream,
+        extra_body=NEMOTRON_THINKING_BUDGET
+    )
+
+def _extract_text(completion, stream):
+    """Return (final_text, reasoning_parts) from a streaming or regular
+    Nemotron completion (SDK objects or plain dicts)."""
+    reasoning_parts = []
+    if stream:
+        assembled = []
+        assembled_append = assembled.append
+        reasoning_append = reasoning_parts.append
+        for reasoning, content in _iter_stream_deltas(completion):
+            if reasoning:
+                reasoning_append(str(reasoning))
+            if content:
+                assembled_append(str(content))
+        return "".join(assembled).strip(), reasoning_parts
+
+    if isinstance(completion, dict):
+        choices = completion.get('choices') or []
+    else:
+        choices = getattr(completion, 'choices', None) or []
+    if not choices:
+        return "", reasoning_parts
+    ch0 = choices[0]
+    if isinstance(ch0, dict):
+        msg = ch0.get('message') or {}
+        text_out = msg.get('content') or ch0.get('text')
+    else:
+        msg = getattr(ch0, 'message', None)
+        content = msg.get('content') if isinstance(msg, dict) else getattr(msg, 'content', None)
+        text_out = content or getattr(ch0, 'text', None)
+    return (text_out or "").strip(), reasoning_parts
+
+def _sse(payload):
+    return f"data: {json.dumps(payload)}\n\n"
+
+def _stream_agent_reply(completion, agent_plan, local_response, show_reasoning):
+    """Relay Nemotron tokens to the client as Server-Sent Events as they
+    arrive, then send a final event carrying the full reply and agent plan.
+    If the stream fails or produces no text, the local response is sent."""
+    assembled = []
+    reasoning_parts = []
+    assembled_append = assembled.append
+    reasoning_append = reasoning_parts.append
+    try:
+        for reasoning, content in _iter_stream_deltas(completion):
+            if reasoning:
+                reasoning_append(str(reasoning))
+            if content:
+                content = str(content)
+                assembled_append(content)
+                yield _sse({'token': content})
+    except Exception as e:
+        print("[Nemotron] streaming call failed:", str(e))
+        agent_plan.append(f"Nemotron call failed (stream): {str(e)}")
+
+    final_text = "".join(assembled).strip()
+    if final_text:
+        agent_plan.append("Tool Result: Response generated by Nemotron (stream).")
+        if reasoning_parts and show_reasoning:
+            agent_plan.append("Nemotron reasoning: " + " ".join(reasoning_parts))
+    else:
+        agent_plan.append("Warning: Nemotron streamed no text; keeping local response.")
+        final_text = local_response
+        yield _sse({'token': local_response})
+
+    yield _sse({'done': True, 'agent_response': final_text, 'agent_plan': agent_plan})
 
 @app.route('/api/agent/chat', methods=['POST'])
 @requires_auth
@@ -819,85 +1166,32 @@ def handle_agent_chat():
     nv_api_key = request.json.get('nv_api_key') or os.environ.get('NV_API_KEY')
     use_nemotron = bool(request.json.get('use_nemotron')) or bool(nv_api_key)
     show_reasoning = bool(request.json.get('debug')) or bool(os.environ.get('NV_SHOW_REASONING'))
+    # Clients that send `Accept: text/event-stream` get Nemotron tokens streamed as SSE
+    wants_stream = request.accept_mimetypes.best == 'text/event-stream'
     
     agent_plan = [] 
     agent_final_response = ""
-
-    if "suspicious" in user_message.lower() or "anomaly" in user_message.lower() or "ticket" in user_message.lower():
-        agent_plan.append("Plan: User asked about discrepancies. I will call the real `tickets_match()` tool.")
-        
-        match_data = tickets_match().get_json() 
-        
-        suspicious_matches = [m for m in match_data.get('matches', []) if m['suspicious']]
-        unmatched_drains = match_data.get('unmatched_drains', [])
-        
-        if suspicious_matches or unmatched_drains:
-            agent_plan.append("Tool Result: Found discrepancies.")
-            agent_final_response = "I've checked the tickets and found some problems:\n"
-            for match in suspicious_matches:
-                agent_final_response += f"  - Suspicious Ticket: {match['ticket_id']} ({match['cauldron_id']}). Reason: {match['reason']}\n"
-            for drain in unmatched_drains:
-                agent_final_response += f"  - Unmatched Drain: {drain['cauldron_id']} on {drain['day']} for {drain['event']['drained']:.1f}L.\n"
-        else:
-            agent_plan.append("Tool Result: No discrepancies found.")
-            agent_final_response = "I've checked all tickets against the historical data. All potion flows are accounted for."
-
-    elif "forecast" in user_message.lower() or "full" in user_message.lower():
-        agent_plan.append("Plan: User asked for forecasts. I will call `forecast_fill_times()`.")
-        
-        forecasts = forecast_fill_times().get_json()
-        agent_plan.append(f"Tool Result: {forecasts}")
-        
-        agent_final_response = "Here is the live forecast (top 5):\n"
-        forecasts.sort(key=lambda x: x.get('time_to_full_min', 9999))
-        for f in forecasts[:5]:
-            agent_final_response += f"  - {f['name']} ({f['cauldron_id']}) will be full in {f['time_to_full_min']} minutes.\n"
-
-    elif "dispatch" in user_message.lower() or "empty" in user_message.lower():
-        cauldron_id_to_dispatch = None
-        for cauldron in factory_static_data['cauldrons']:
-            if cauldron['id'] in user_message.lower() or cauldron['name'].split(" ")[0].lower() in user_message.lower():
-                cauldron_id_to_dispatch = cauldron['id']
-                break
-        
-        if cauldron_id_to_dispatch:
-            agent_plan.append(f"Plan: User wants to dispatch to {cauldron_id_to_dispatch}. I will call `dispatch_courier()`.")
-            
-            dispatch_response = requests.post(
-                "http://127.0.0.1:5000/api/logistics/dispatch_courier", 
-                json={"cauldron_id": cauldron_id_to_dispatch}
-            )
-            dispatch_result = dispatch_response.json()
-            
-            agent_plan.append(f"Tool Result: {dispatch_result['status']}.")
-            agent_final_response = dispatch_result['message']
-        else:
-            agent_final_response = "Which cauldron (e.g., cauldron_001) should I dispatch to?"
-            
-    elif "optimize" in user_message.lower() or "routes" in user_message.lower() or "witches" in user_message.lower():
-        agent_plan.append("Plan: User asked for the Bonus. I will explain the solution using the live API data.")
-        
-        network_edges = len(factory_static_data['network'])
-        num_couriers = len(factory_static_data['couriers'])
-        market_name = factory_static_data['market'].get('name', 'The Enchanted Market')
-        
-        agent_final_response = (
-            "This is the EOG Bonus! Here is how I would solve it:\n"
-            f"1. **Use Forecast:** First, I call my `forecast_fill_times()` tool to get a 'deadline' for each cauldron.\n"
-            f"2. **Use Network Map:** I will use the **`/api/Information/network`** data to calculate travel times between the {market_name} and all urgent cauldrons.\n"
-            f"3. **Account for Constraints:** I'll add the 15-minute `unload_time` at the market, plus the `drain_rate` (from `/api/Data/metadata`) to calculate drain time.\n"
-            f"4. **Find Minimum Witches:** I'll run a VRP (Vehicle Routing Problem) algorithm to find the minimum number of the **{num_couriers} available couriers** (from `/api/Information/couriers`) needed to service all cauldrons before they overflow."
-        )
-
+    msg_l = user_message.lower()
+
+    intent = _classify_agent_intent(msg_l)
+    handler = AGENT_HANDLERS.get(intent)
+    # Dispatch/optimize/help replies are already final; only summaries of
+    # tool output benefit from an LLM pass
+    needs_llm_polish = intent in _POLISH_INTENTS
+    if handler:
+        agent_final_response = handler(msg_l, agent_plan)
     else:
-        agent_final_response = "I am connected to the EOG API. I can **check tickets**, **forecast** fill times, **dispatch** couriers, or **optimize routes**."
+        agent_final_response = _HELP_RESPONSE
     
-    if use_nemotron:
+    if use_nemotron and not needs_llm_polish:
+        agent_plan.append("Note: Local response is complete; skipping Nemotron.")
+    elif use_nemotron:
         if not _HAS_NEMOTRON:
             agent_plan.append("Note: Nemotron client not installed; set up 'openai' package to enable.")
         elif not nv_api_key:
             agent_plan.append("Note: NV API key not provided; set 'nv_api_key' in the request or NV_API_KEY env var.")
         else:
+            client = None
             try:
                 system_msg = (
                     "You are an assistant integrated with a factory monitoring system. "
@@ -916,41 +1210,17 @@ def handle_agent_chat():
                     {"role": "user", "content": prompt}
                 ]
 
-                client = OpenAI(base_url="https://integrate.api.nvidia.com/v1", api_key=nv_api_key)
-                completion = client.chat.completions.create(
-                    model="nvidia/nvidia-nemotron-nano-9b-v2",
-                    messages=messages,
-                    temperature=0.6,
-                    top_p=0.95,
-                    max_tokens=512,
-                    frequency_penalty=0,
-                    presence_penalty=0,
-                    stream=True,
-                    extra_body={"min_thinking_tokens": 256, "max_thinking_tokens": 512}
-                )
-
-                assembled = []
-                reasoning_parts = []
-                for chunk in completion:
-                    try:
-                        delta = chunk.choices[0].delta
-                    except Exception:
-                        delta = None
+                client = _nv_client(nv_api_key)
+                completion = _nemotron_create(client, messages, stream=True)
 
-                    if delta is None:
-                        continue
-
-                    reasoning = getattr(delta, 'reasoning_content', None)
-                    content = getattr(delta, 'content', None)
-                    if content is None:
-                        content = getattr(delta, 'text', None)
-
-                    if reasoning:
-                        reasoning_parts.append(str(reasoning))
-                    if content:
-                        assembled.append(str(content))
+                if wants_stream:
+                    return Response(
+                        stream_with_context(_stream_agent_reply(completion, agent_plan, agent_final_response, show_reasoning)),
+                        mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+                    )
 
-                final_text = "".join(assembled).strip()
+                final_text, reasoning_parts = _extract_text(completion, stream=True)
                 if final_text:
                     agent_final_response = final_text
                     agent_plan.append("Tool Result: Response generated by Nemotron (stream).")
@@ -959,44 +1229,13 @@ def handle_agent_chat():
                 else:
                     agent_plan.append("Warning: Nemotron streamed no text; keeping local response.")
             except Exception as e:
-                tb = traceback.format_exc()
                 print("[Nemotron] streaming call failed:", str(e))
-                print(tb)
+                # Traceback is only formatted when debug logging is enabled
+                app.logger.debug("[Nemotron] streaming call failed", exc_info=True)
                 agent_plan.append(f"Nemotron call failed (stream): {str(e)}")
 
                 try:
-                    fallback = client.chat.completions.create(
-                        model="nvidia/nvidia-nemotron-nano-9b-v2",
-                        messages=messages,
-                        temperature=0.6,
-                        top_p=0.95,
-                        max_tokens=512,
-                        frequency_penalty=0,
-                        presence_penalty=0,
-                        stream=False,
-                        extra_body={"min_thinking_tokens": 256, "max_thinking_tokens": 512}
-                    )
-                    text_out = ""
-                    try:
-                        if hasattr(fallback, 'choices'):
-                            ch0 = fallback.choices[0]
-                            if hasattr(ch0, 'message') and isinstance(ch0.message, dict) and 'content' in ch0.message:
-                                text_out = ch0.message['content']
-                            elif hasattr(ch0, 'text'):
-                                text_out = ch0.text
-                            elif isinstance(ch0, dict):
-                                msg = ch0.get('message') or {}
-                                text_out = msg.get('content') or ch0.get('text') or ""
-                        elif isinstance(fallback, dict):
-                            choices = fallback.get('choices', [])
-                            if choices:
-                                c0 = choices[0]
-                                msg = c0.get('message') or {}
-                                text_out = msg.get('content') or c0.get('text') or ""
-                    except Exception as e_parse:
-                        agent_plan.append(f"Nemotron fallback parse failed: {e_parse}")
-
-                    text_out = (text_out or "").strip()
+                    text_out, _ = _extract_text(_nemotron_create(client, messages, stream=False), stream=False)
                     if text_out:
                         agent_final_response = text_out
                         agent_plan.append("Tool Result: Nemotron non-streaming response used as fallback.")
@@ -1012,24 +1251,35 @@ def handle_agent_chat():
     })
 
 # --- Frontend Routes ---
+# Pages are read once at startup and served from memory with an ETag, so a
+# hit costs no stat()/open() and repeat visits get a 304.
+def _load_page(filename):
+    with open(os.path.join(app.root_path, filename), 'rb') as f:
+        body = f.read()
+    return body, hashlib.md5(body).hexdigest()
+
+_INDEX_HTML, _INDEX_ETAG = _load_page('index.html')
+_DASHBOARD_HTML, _DASHBOARD_ETAG = _load_page('dashboard.html')
+
+def _serve_page(body, etag, cache_control):
+    resp = Response(body, mimetype='text/html')
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = cache_control
+    return resp.make_conditional(request)
+
 @app.route('/')
 def index():
-    return send_from_directory(app.root_path, 'index.html')
+    return _serve_page(_INDEX_HTML, _INDEX_ETAG, 'public, max-age=60')
 
 @app.route('/dashboard')
 @requires_auth
 def dashboard():
-    # Get user info from session for display
-    user_info = session.get('user', {}).get('userinfo', {})
-    return send_from_directory(app.root_path, 'dashboard.html')
+    # Revalidate every time so the auth check always runs; unchanged pages still get a 304
+    return _serve_page(_DASHBOARD_HTML, _DASHBOARD_ETAG, 'private, no-cache')
 
 @app.route('/api/time')
 def api_time():
-    try:
-        now = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat()
-        return jsonify({'server_time': now})
-    except Exception:
-        return jsonify({'server_time': None})
+    return jsonify({'server_time': datetime.now(timezone.utc).isoformat()})
 
 @app.route('/api/user')
 @requires_auth